@@ -1,15 +1,116 @@
 import pandas as pd
 import xml.etree.ElementTree as ET
 import json
+from collections import deque
+from itertools import islice
+
+# Rows per DataFrame when a file is read in chunks
+CHUNK_SIZE = 100000
+# Characters read at a time when streaming a JSON array
+JSON_BLOCK_SIZE = 1 << 20
+
+
+def _offer_record(offer):
+    record_data = {
+        'offer id': offer.get('id'),
+        'available': offer.get('available')
+    }
+    for elem in offer:
+        if elem.tag == 'param':
+            record_data[f'{elem.tag} name="{elem.get("name")}"'] = elem.text
+        else:
+            record_data[elem.tag] = elem.text
+    return record_data
+
+
+def _iter_json_items(file):
+    """Items of a top-level JSON array, decoded one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_BLOCK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        # Not an array: there is nothing to stream
+        data = json.loads(buffer + file.read())
+        yield from data if isinstance(data, list) else [data]
+        return
+    position = 1
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            item = end = None
+        # A number at the very end of the buffer may continue in the next block
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise json.JSONDecodeError("Unterminated JSON array", buffer, position)
+            block = file.read(JSON_BLOCK_SIZE)
+            eof = not block
+            buffer = buffer[position:] + block
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def _flat_record(item, prefix=''):
+    """Nested objects of a JSON item as 'parent.child' columns, like json_normalize"""
+    if not isinstance(item, dict):
+        return item
+    record = {}
+    for key, value in item.items():
+        if isinstance(value, dict):
+            record.update(_flat_record(value, f'{prefix}{key}.'))
+        else:
+            record[f'{prefix}{key}'] = value
+    return record
+
+
+def _frame(records, columns=None, index=None):
+    """DataFrame of the values as they were read. Columns keep the object
+    dtype: an inferred dtype depends on the rows at hand, so a chunk and the
+    whole file could hold the same cell as 2, 2.0 or '2'."""
+    return pd.DataFrame(records, columns=columns, index=index, dtype=object)
+
+
+def _xlsx_rows(file_path):
+    """Header and then the rows of the active sheet, as openpyxl reads them"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _frames(records, chunk_size):
+    """Lists of up to chunk_size records with the index of their rows in the file"""
+    start = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk, pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+
 
 class DataParser:
     @staticmethod
     def parse_csv(file_path):
-        return pd.read_csv(file_path)
+        # Cells are kept as text, so a whole file and its chunks read the same values
+        return pd.read_csv(file_path, dtype=object)
 
     @staticmethod
     def parse_xlsx(file_path):
-        return pd.read_excel(file_path)
+        # Read the same way as iter_xlsx_chunks
+        rows = _xlsx_rows(file_path)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        return _frame(list(rows), columns=header)
 
     @staticmethod
     def parse_xml(file_path):
@@ -21,23 +122,14 @@ class DataParser:
     def parse_json(file_path):
         with open(file_path, 'r') as file:
             data = json.load(file)
-        return pd.json_normalize(data)
+        if not isinstance(data, list):
+            data = [data]
+        return _frame([_flat_record(item) for item in data])
 
     @staticmethod
     def xml_to_dataframe(root):
-        all_records = []
-        for offer in root.findall('.//offer'):
-            record_data = {
-                'offer id': offer.get('id'),
-                'available': offer.get('available')
-            }
-            for elem in offer:
-                if elem.tag == 'param':
-                    record_data[f'{elem.tag} name="{elem.get("name")}"'] = elem.text
-                else:
-                    record_data[elem.tag] = elem.text
-            all_records.append(record_data)
-        return pd.DataFrame(all_records)
+        all_records = [_offer_record(offer) for offer in root.findall('.//offer')]
+        return _frame(all_records)
 
     @staticmethod
     def parse_file(file_path):
@@ -52,6 +144,75 @@ class DataParser:
         else:
             raise ValueError('Unsupported file format')
 
+    @staticmethod
+    def iter_csv_chunks(file_path, chunk_size=CHUNK_SIZE):
+        # read_csv keeps numbering rows across chunks
+        yield from pd.read_csv(file_path, chunksize=chunk_size, dtype=object)
+
+    @staticmethod
+    def iter_xlsx_chunks(file_path, chunk_size=CHUNK_SIZE):
+        rows = _xlsx_rows(file_path)
+        try:
+            header = next(rows, None)
+            if header is None:
+                return
+            for records, index in _frames(rows, chunk_size):
+                yield _frame(records, columns=header, index=index)
+        finally:
+            rows.close()
+
+    @staticmethod
+    def iter_xml_chunks(file_path, chunk_size=CHUNK_SIZE):
+        def offers():
+            # Same offers, in the same order, as root.findall('.//offer'):
+            # every <offer> below the root, nested ones included, in the
+            # order they start. An offer is read when it ends, so records
+            # wait in `pending` until all offers that started earlier are
+            # read. Elements that are not inside an open offer are dropped
+            # from the tree once they end, so the tree never grows.
+            path = []
+            open_offers = []
+            pending = deque()
+            for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == 'offer' and path:
+                        slot = [None]
+                        open_offers.append(slot)
+                        pending.append(slot)
+                    path.append(elem)
+                    continue
+                path.pop()
+                if elem.tag == 'offer' and path:
+                    open_offers.pop()[0] = _offer_record(elem)
+                    while pending and pending[0][0] is not None:
+                        yield pending.popleft()[0]
+                if path and not open_offers:
+                    path[-1].remove(elem)
+                    elem.clear()
+
+        for records, index in _frames(offers(), chunk_size):
+            yield _frame(records, index=index)
+
+    @staticmethod
+    def iter_json_chunks(file_path, chunk_size=CHUNK_SIZE):
+        with open(file_path, 'r') as file:
+            for records, index in _frames(_iter_json_items(file), chunk_size):
+                yield _frame([_flat_record(item) for item in records], index=index)
+
+    @staticmethod
+    def iter_chunks(file_path, chunk_size=CHUNK_SIZE):
+        """DataFrames of up to chunk_size rows; the index is the row number in the whole file"""
+        if file_path.endswith('.csv'):
+            return DataParser.iter_csv_chunks(file_path, chunk_size)
+        elif file_path.endswith('.xlsx'):
+            return DataParser.iter_xlsx_chunks(file_path, chunk_size)
+        elif file_path.endswith('.xml'):
+            return DataParser.iter_xml_chunks(file_path, chunk_size)
+        elif file_path.endswith('.json'):
+            return DataParser.iter_json_chunks(file_path, chunk_size)
+        else:
+            raise ValueError('Unsupported file format')
+
     @staticmethod
     def extract_data_by_arguments(dataframe, arguments):
         # Filter data based on provided arguments
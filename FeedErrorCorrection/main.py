@@ -13,6 +13,9 @@ import pandas as pd
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Rows read to list the fields of a selected file
+PREVIEW_ROWS = 1000
+
 class FeedErrorCorrectionApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -67,13 +70,18 @@ class FeedErrorCorrectionApp(QMainWindow):
             self.selected_file = file_name
             logging.info(f'Selected file: {file_name}')
 
-            # Parse the file
-            data = DataParser.parse_file(self.selected_file)
-            logging.info(f'Parsed file: {self.selected_file}')
+            # Only the first rows are parsed, the file may not fit in memory
+            chunks = DataParser.iter_chunks(self.selected_file, PREVIEW_ROWS)
+            try:
+                data = next(chunks, None)
+            finally:
+                chunks.close()
+            logging.info(f'Parsed file header: {self.selected_file}')
 
             # Populate field selector with columns from the file
             self.field_selector.clear()
-            self.field_selector.addItems(data.columns)
+            if data is not None:
+                self.field_selector.addItems([str(column) for column in data.columns])
 
     def add_field_input(self):
         selected_column = self.field_selector.currentText()
@@ -193,13 +201,10 @@ class FeedErrorCorrectionApp(QMainWindow):
         self.rules = self.collect_rules()
         logging.info(f'Collected rules: {self.rules}')
 
-        # Parse the file
-        data = DataParser.parse_file(self.selected_file)
-        logging.info(f'Parsed file: {self.selected_file}')
-
-        # Validate the data
+        # Validate the file chunk by chunk; error indices are row numbers in the file
         validator = Validator(self.rules)
-        errors = validator.validate(data)
+        errors = validator.validate_chunks(DataParser.iter_chunks(self.selected_file))
+        logging.info(f'Validated file: {self.selected_file}')
 
         # Output errors
         if errors:
@@ -209,6 +214,8 @@ class FeedErrorCorrectionApp(QMainWindow):
 
             # Ask user if they want to correct errors
             reply = QMessageBox.question(self, 'Correct Errors', 'Do you want to correct the errors automatically?', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            # Both corrections write a copy of the whole feed, so only they load it
+            data = DataParser.parse_file(self.selected_file)
             if reply == QMessageBox.Yes:
                 self.correct_errors(data, errors)
             else:
@@ -240,7 +247,7 @@ class FeedErrorCorrectionApp(QMainWindow):
                 except ValueError:
                     logging.error(f'Invalid default value for FLOAT: {default_value}')
                     data.at[index, field] = 0.0
-            elif rule['type'] == 'СТРОКА':
+            elif rule['type'] in ('СТРОКА', 'ДАТА'):
                 data.at[index, field] = default_value if default_value else ''
 
         # Save corrected file
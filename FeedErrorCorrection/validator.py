@@ -1,41 +1,247 @@
-import ast
+import datetime
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Format shown in the rules editor by default
+DEFAULT_DATE_FORMAT = 'YYYY-MM-DD'
+
+# Human date format tokens and their strptime directives, longest first
+_DATE_TOKENS = {
+    'YYYY': '%Y', 'YY': '%y', 'MM': '%m', 'DD': '%d',
+    'HH': '%H', 'mm': '%M', 'SS': '%S', 'ss': '%S',
+}
+_DATE_TOKEN_RE = re.compile('|'.join(_DATE_TOKENS))
+
+
+def _map_distinct(column, func, missing):
+    """Apply func to every cell, calling it once per distinct value.
+    Empty cells get `missing`."""
+    codes, distinct = pd.factorize(column)
+    results = [func(value) for value in distinct]
+    # Empty cells have code -1, which picks the last item
+    results.append(missing)
+    return np.asarray(results)[codes]
+
+
+def _numbers(column, convert):
+    """Column values as converted by int() or float(), plus a mask of values
+    that fail to convert. Empty cells become NaN and are not invalid."""
+    if pd.api.types.is_numeric_dtype(column.dtype) or pd.api.types.is_bool_dtype(column.dtype):
+        numbers = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        if convert is float:
+            return numbers, np.zeros(len(numbers), dtype=bool)
+        # int() truncates and rejects infinity
+        invalid = np.isinf(numbers)
+        return np.trunc(np.where(invalid, np.nan, numbers)), invalid
+
+    def parse(value):
+        try:
+            return float(convert(value)), False
+        except (ValueError, TypeError, OverflowError):
+            return np.nan, True
+
+    parsed = _map_distinct(column, parse, (np.nan, False))
+    return parsed[:, 0].astype(np.float64), parsed[:, 1].astype(bool)
+
+
+@lru_cache(maxsize=None)
+def _strptime_format(date_format):
+    """strptime format for a rule's date format. Formats such as 'YYYY-MM-DD'
+    are translated; formats that already use % directives are kept."""
+    if '%' in date_format:
+        return date_format
+    return _DATE_TOKEN_RE.sub(
+        lambda match: _DATE_TOKENS[match.group()], date_format
+    )
+
+
+def _date_mask(column, date_format):
+    """Mask of the cells that don't match the date format. Empty cells
+    (NaN or '') and cells that already hold dates are valid."""
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        return np.zeros(len(column), dtype=bool)
+    codes, distinct = pd.factorize(column)
+    distinct = pd.Series(distinct, dtype=object)
+    skipped = distinct.map(
+        lambda value: value == '' or isinstance(value, datetime.date)
+    ).to_numpy(dtype=bool)
+    # Each distinct string is parsed once, all of them in one call
+    parsed = pd.to_datetime(distinct.astype(str), format=_strptime_format(date_format),
+                            errors='coerce')
+    invalid = np.append(parsed.isna().to_numpy() & ~skipped, False)
+    # Empty cells have code -1, which picks the last item
+    return invalid[codes]
+
+
+# Rows per chunk sent to a worker process
+CHUNK_SIZE = 100000
+
+
+# Validator inside a worker process, created once when the worker starts
+_worker_validator = None
+
+
+def _init_worker(rules):
+    global _worker_validator
+    _worker_validator = Validator(rules)
+
+
+def _error_arrays(dataframe):
+    return _worker_validator.error_arrays(dataframe)
+
 
 class Validator:
-    def __init__(self, rules):
+    def __init__(self, rules, workers=1, chunk_size=CHUNK_SIZE):
+        """With workers > 1, dataframes longer than chunk_size rows are
+        validated in chunks by a pool of worker processes."""
         self.rules = rules
+        self.workers = workers
+        self.chunk_size = chunk_size
 
     def validate(self, dataframe):
+        """Validate the dataframe one column at a time.
+
+        Returns (index, field, value, rule) errors ordered by row, then by
+        rule. Empty cells are skipped; a value that can't be converted to a
+        number is an error. The result doesn't depend on the number of workers.
+        """
+        if self.workers <= 1 or len(dataframe) <= self.chunk_size:
+            return self.errors(dataframe, self.error_arrays(dataframe))
+        chunks = (dataframe.iloc[start:start + self.chunk_size]
+                  for start in range(0, len(dataframe), self.chunk_size))
+        return self._validate_parallel(chunks)
+
+    def validate_chunks(self, chunks):
+        """Validate a stream of dataframes, e.g. DataParser.iter_chunks().
+        Only a few chunks are held at a time; error indices come from the chunks."""
+        if self.workers <= 1:
+            errors = []
+            for chunk in chunks:
+                errors.extend(self.validate(chunk))
+            return errors
+        return self._validate_parallel(chunks)
+
+    def _validate_parallel(self, chunks):
         errors = []
-        for index, row in dataframe.iterrows():
-            for field, rule in self.rules.items():
-                if field in row:
-                    value = row[field]
-                    # Apply rule based on type
-                    if rule['type'] == 'ЦЕЛОЕ':
-                        if 'min' in rule and int(value) < rule['min']:
-                            errors.append((index, field, value, rule))
-                        elif 'max' in rule and int(value) > rule['max']:
-                            errors.append((index, field, value, rule))
-                    elif rule['type'] == 'ВЕЩЕСТВЕННОЕ':
-                        if 'min' in rule and float(value) < rule['min']:
-                            errors.append((index, field, value, rule))
-                        elif 'max' in rule and float(value) > rule['max']:
-                            errors.append((index, field, value, rule))
-                    elif rule['type'] == 'СТРОКА':
-                        if 'max_length' in rule and len(value) > rule['max_length']:
-                            errors.append((index, field, value, rule))
-                        elif 'allowed_chars' in rule:
-                            for char in value:
-                                if char not in rule['allowed_chars']:
-                                    errors.append((index, field, value, rule))
-                        elif 'date_format' in rule:
-                            try:
-                                ast.parse(value, rule['date_format'])
-                            except SyntaxError:
-                                errors.append((index, field, value, rule))
-                    # Add more rule types as needed
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                 initargs=(self.rules,)) as pool:
+            # Limit the chunks in flight so a chunk stream isn't read into memory
+            pending = deque()
+            chunks = iter(chunks)
+            while True:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    # Workers only get the columns that have rules
+                    columns = [field for field in self.rules if field in chunk.columns]
+                    pending.append((chunk, pool.submit(_error_arrays, chunk[columns])))
+                if pending and (chunk is None or len(pending) >= self.workers * 2):
+                    chunk, future = pending.popleft()
+                    errors.extend(self.errors(chunk, future.result()))
+                if chunk is None and not pending:
+                    break
         return errors
 
+    def error_arrays(self, dataframe):
+        """Errors of the dataframe in compact form: row positions, rule
+        numbers (in the order of self.rules) and the disallowed characters
+        of each error (None if there are no allowed_chars errors), ordered by
+        row, then by rule"""
+        positions = []
+        rule_numbers = []
+        bad_chars = []
+        has_bad_chars = False
+        for number, (field, rule) in enumerate(self.rules.items()):
+            if field not in dataframe.columns:
+                continue
+            rows, chars = self.rule_errors(dataframe[field], rule)
+            if len(rows):
+                positions.append(rows)
+                rule_numbers.append(np.full(len(rows), number, dtype=np.int32))
+                if chars is None:
+                    chars = np.full(len(rows), None, dtype=object)
+                else:
+                    has_bad_chars = True
+                bad_chars.append(chars)
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), None
+
+        positions = np.concatenate(positions)
+        # A stable sort keeps the rule order within a row
+        order = np.argsort(positions, kind='stable')
+        bad_chars = np.concatenate(bad_chars)[order] if has_bad_chars else None
+        return positions[order], np.concatenate(rule_numbers)[order], bad_chars
+
+    def errors(self, dataframe, arrays):
+        """(index, field, value, rule) errors from error_arrays() of the dataframe"""
+        positions, rule_numbers, bad_chars = arrays
+        rules = list(self.rules.items())
+        values = {}
+        # Rules with the disallowed characters, one per rule and set of characters
+        error_rules = {}
+        index = dataframe.index
+        errors = []
+        for error_number, (position, number) in enumerate(zip(positions.tolist(),
+                                                              rule_numbers.tolist())):
+            field, rule = rules[number]
+            column = values.get(field)
+            if column is None:
+                column = values[field] = dataframe[field].to_numpy(dtype=object)
+            chars = bad_chars[error_number] if bad_chars is not None else None
+            if chars is not None:
+                key = (number, chars)
+                if key not in error_rules:
+                    error_rules[key] = dict(rule, bad_chars=chars)
+                rule = error_rules[key]
+            errors.append((index[position], field, column[position], rule))
+        return errors
+
+    def rule_errors(self, column, rule):
+        """Positions of the cells that fail the rule, and the disallowed
+        characters of each of them for allowed_chars rules (None otherwise)"""
+        if rule['type'] == 'ЦЕЛОЕ':
+            return np.flatnonzero(self._range_mask(column, rule, int)), None
+        elif rule['type'] == 'ВЕЩЕСТВЕННОЕ':
+            return np.flatnonzero(self._range_mask(column, rule, float)), None
+        elif rule['type'] == 'СТРОКА':
+            if 'max_length' in rule:
+                lengths = _map_distinct(column, lambda value: len(str(value)), 0)
+                return np.flatnonzero(lengths > rule['max_length']), None
+            elif 'allowed_chars' in rule:
+                # Deleting the allowed characters leaves only the bad ones
+                table = str.maketrans('', '', rule['allowed_chars'])
+                bad_chars = _map_distinct(
+                    column, lambda value: ''.join(sorted(set(str(value).translate(table)))), ''
+                )
+                # One error per cell; the rule reported with it lists the bad characters
+                rows = np.flatnonzero(bad_chars != '')
+                return rows, bad_chars[rows].astype(object)
+            elif 'date_format' in rule:
+                return np.flatnonzero(_date_mask(column, rule['date_format'])), None
+        elif rule['type'] == 'ДАТА':
+            date_format = rule.get('date_format') or DEFAULT_DATE_FORMAT
+            return np.flatnonzero(_date_mask(column, date_format)), None
+        # Add more rule types as needed
+        return np.empty(0, dtype=np.int64), None
+
+    def _range_mask(self, column, rule, convert):
+        has_min = 'min' in rule
+        has_max = 'max' in rule
+        if not has_min and not has_max:
+            return np.zeros(len(column), dtype=bool)
+        numbers, invalid = _numbers(column, convert)
+        with np.errstate(invalid='ignore'):
+            mask = invalid.copy()
+            if has_min:
+                mask |= numbers < rule['min']
+            if has_max:
+                mask |= numbers > rule['max']
+        return mask
+
     def apply_rule(self, value, rule):
         # Example rule application
         if rule['type'] == 'INTEGER':
@@ -73,7 +279,6 @@ class Validator:
         if 'max_length' in rule and len(value) > rule['max_length']:
             return False
         if 'allowed_chars' in rule:
-            for char in value:
-                if char not in rule['allowed_chars']:
-                    return False
+            if value.translate(str.maketrans('', '', rule['allowed_chars'])):
+                return False
         return True
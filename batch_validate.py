@@ -0,0 +1,159 @@
+"""Пакетная проверка фидов из командной строки, без графического интерфейса.
+
+Пример:
+    python batch_validate.py config.json feed1.xml feed2.xlsx --format csv -o result.csv
+
+Коды возврата:
+    0 - все товары соответствуют условиям
+    1 - найдены товары с ошибками
+    2 - не удалось прочитать конфигурацию или один из фидов
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from column_cache import ColumnCache
+from feed_reader import iter_xml_values, iter_xlsx_values
+from feed_validator import validate_offers, build_report, fields_conditions_from_config
+from result_cache import validate_cached
+
+EXIT_OK = 0
+EXIT_ERRORS_FOUND = 1
+EXIT_FAILURE = 2
+
+
+def iter_feed_values(filename, field_names, column_cache=None):
+    """Выбор способа чтения по расширению файла"""
+    if filename.lower().endswith('.xlsx'):
+        read_values = iter_xlsx_values
+    else:
+        read_values = iter_xml_values
+    if column_cache is not None:
+        return column_cache.iter_values(filename, field_names, read_values)
+    return read_values(filename, field_names)
+
+
+def validate_feed(filename, fields_conditions, workers=1, columnar=False, cache_path=None,
+                  column_cache=None):
+    """Проверка одного фида: отчет с итогами и ошибками"""
+    offers = iter_feed_values(filename, list(fields_conditions), column_cache)
+    if cache_path is not None:
+        results = validate_cached(cache_path, fields_conditions, filename, offers, workers, columnar)
+    else:
+        results = validate_offers(fields_conditions, offers, workers, columnar=columnar)
+    return build_report(fields_conditions, results)
+
+
+def iter_error_records(report):
+    for label, field_name, error in report.iter_errors():
+        yield label, field_name, error if error is not None else "не найдено"
+
+
+def write_json(filename, report, out):
+    # Одна строка JSON на фид, чтобы вывод можно было читать построчно
+    result = {
+        'file': filename,
+        'total_offers': report.total_offers,
+        'offers_with_errors': report.offers_with_errors,
+        'errors': [
+            {'offer': label, 'field': field_name, 'error': error}
+            for label, field_name, error in iter_error_records(report)
+        ]
+    }
+    out.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+
+def write_csv(filename, report, writer):
+    for label, field_name, error in iter_error_records(report):
+        writer.writerow([filename, label, field_name, error])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Проверка XML/XLSX фидов по конфигурации полей, сохраненной в редакторе",
+        epilog="Коды возврата: 0 - ошибок нет, 1 - найдены ошибки, 2 - сбой чтения",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('config', help="JSON файл конфигурации полей")
+    parser.add_argument('feeds', nargs='+', help="XML или XLSX файлы для проверки")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json',
+                        help="формат вывода: JSON Lines (по строке на фид) или CSV")
+    parser.add_argument('-o', '--output', help="файл для результатов (по умолчанию stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="число процессов для проверки (по умолчанию 1)")
+    parser.add_argument('--columnar', action='store_true',
+                        help="векторная проверка по столбцам (нужны numpy 2 и pandas)")
+    parser.add_argument('--cache', metavar='FILE',
+                        help="файл SQLite с результатами прошлых проверок: "
+                             "проверяются только изменившиеся товары")
+    parser.add_argument('--columns-cache', metavar='DIR',
+                        help="каталог для значений полей разобранных фидов: "
+                             "неизменившийся фид не разбирается повторно")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            fields_conditions = fields_conditions_from_config(json.load(f))
+    except Exception as e:
+        print(f"Не удалось загрузить конфигурацию: {str(e)}", file=sys.stderr)
+        return EXIT_FAILURE
+
+    if args.output:
+        try:
+            out = open(args.output, 'w', encoding='utf-8', newline='')
+        except OSError as e:
+            print(f"Не удалось открыть файл результатов: {str(e)}", file=sys.stderr)
+            return EXIT_FAILURE
+    else:
+        out = sys.stdout
+
+    column_cache = ColumnCache(args.columns_cache) if args.columns_cache else None
+
+    exit_code = EXIT_OK
+    try:
+        writer = None
+        if args.format == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(['file', 'offer', 'field', 'error'])
+
+        for filename in args.feeds:
+            if not os.path.isfile(filename):
+                print(f"{filename}: файл не найден", file=sys.stderr)
+                exit_code = EXIT_FAILURE
+                continue
+            try:
+                report = validate_feed(filename, fields_conditions, args.workers, args.columnar,
+                                      args.cache, column_cache)
+            except Exception as e:
+                print(f"{filename}: ошибка при проверке файла: {str(e)}", file=sys.stderr)
+                exit_code = EXIT_FAILURE
+                continue
+
+            if writer is not None:
+                write_csv(filename, report, writer)
+            else:
+                write_json(filename, report, out)
+            out.flush()
+
+            if report.offers_with_errors and exit_code == EXIT_OK:
+                exit_code = EXIT_ERRORS_FOUND
+    except OSError as e:
+        # Код 1 означал бы, что проверка прошла и нашла ошибки
+        print(f"Не удалось записать результаты: {str(e)}", file=sys.stderr)
+        exit_code = EXIT_FAILURE
+    finally:
+        if out is not sys.stdout:
+            try:
+                out.close()
+            except OSError as e:
+                if exit_code != EXIT_FAILURE:
+                    print(f"Не удалось записать результаты: {str(e)}", file=sys.stderr)
+                exit_code = EXIT_FAILURE
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Генератор синтетических фидов для замеров производительности.
+
+Пишет один и тот же набор товаров в YML/XML, XLSX, CSV или JSON потоково,
+так что размер фида ограничен только диском. У каждого товара есть
+основные поля (name, SKU, price, discount, category, date) и
+дополнительные свойства "Свойство N"; с вероятностью error_rate одно из
+полей товара получает ошибочное значение.
+
+Пример:
+    python benchmarks/feed_generator.py --offers 1000000 --fields 30 \\
+        --error-rate 0.05 --formats xml csv -o feeds
+"""
+import argparse
+import json
+import os
+import random
+from xml.sax.saxutils import escape, quoteattr
+
+BASE_FIELDS = ['name', 'SKU', 'price', 'discount', 'category', 'date']
+
+# Больше строк в листе Excel не помещается
+XLSX_MAX_OFFERS = 1048575
+
+FORMATS = ['xml', 'xlsx', 'csv', 'json']
+
+CATEGORIES = ["Электроника", "Одежда", "Книги", "Дом и сад", "Спорт", "Игрушки"]
+WORDS = ["Товар", "новый", "красный", "большой", "удобный", "Pro", "Max", "mini", "2024"]
+
+
+def param_names(fields):
+    """Имена дополнительных свойств при общем числе полей fields"""
+    return [f"Свойство {number}" for number in range(1, max(0, fields - len(BASE_FIELDS)) + 1)]
+
+
+def field_config(fields):
+    """Конфигурация полей для редактора (main.py) в формате JSON-файла"""
+    def field(name, field_type, *conditions):
+        return {
+            'name': name,
+            'type': field_type,
+            'conditions': [
+                {'type': condition_type, 'field_type': field_type, 'values': values}
+                for condition_type, values in conditions
+            ]
+        }
+
+    config = [
+        field('name', 'text', ("Длина", {'min': 1, 'max': 120})),
+        field('SKU', 'text', ("Маска", {'pattern': "\\D\\D\\D-\\d\\d\\d\\d\\d\\d\\d\\d"})),
+        field('price', 'float', ("Диапазон", {'min': 0, 'max': 100000}),
+              ("Точность", {'precision': 2})),
+        field('discount', 'number', ("Диапазон", {'min': 0, 'max': 100})),
+        field('category', 'text', ("Длина", {'min': 1, 'max': 100})),
+        field('date', 'date', ("Диапазон дат", {'min': "2000-01-01", 'max': "2030-12-31"})),
+    ]
+    config.extend(field(name, 'text', ("Длина", {'min': 0, 'max': 50}))
+                  for name in param_names(fields))
+    return config
+
+
+def validator_rules():
+    """Правила для FeedErrorCorrection.validator.Validator"""
+    return {
+        'price': {'type': 'ВЕЩЕСТВЕННОЕ', 'min': 0, 'max': 100000},
+        'discount': {'type': 'ЦЕЛОЕ', 'min': 0, 'max': 100},
+        'name': {'type': 'СТРОКА', 'max_length': 120},
+        'SKU': {'type': 'СТРОКА', 'allowed_chars': "SKU-0123456789"},
+        'date': {'type': 'СТРОКА', 'date_format': "%Y-%m-%d"},
+    }
+
+
+def _broken(field, value, rng):
+    """Ошибочное значение поля; значения числовых полей остаются числами"""
+    if field == 'name':
+        return value + " очень длинное название" * 6
+    if field == 'SKU':
+        return value[:6] + "#" + value[7:]
+    if field == 'price':
+        return -value if rng.random() < 0.5 else value * 1000 + 0.123
+    if field == 'discount':
+        return 100 + value + 1
+    if field == 'category':
+        return ""
+    if field == 'date':
+        return value.replace('-', '/')
+    return "x" * 60
+
+
+def iter_offers(offers, fields, error_rate, seed=0):
+    """Товары фида: (id, available, словарь значений полей)"""
+    rng = random.Random(seed)
+    params = param_names(fields)
+    all_fields = BASE_FIELDS + params
+    for offer_id in range(1, offers + 1):
+        values = {
+            'name': " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))),
+            'SKU': f"SKU-{offer_id:08d}",
+            'price': round(rng.uniform(1, 50000), 2),
+            'discount': rng.randint(0, 90),
+            'category': rng.choice(CATEGORIES),
+            'date': f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+        for name in params:
+            values[name] = f"значение {rng.randint(1, 1000)}"
+        if rng.random() < error_rate:
+            field = rng.choice(all_fields)
+            values[field] = _broken(field, values[field], rng)
+        yield offer_id, rng.random() < 0.9, values
+
+
+def write_xml(path, offers):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<yml_catalog date="2024-01-01 00:00">\n'
+                '<shop>\n<name>Benchmark</name>\n<offers>\n')
+        for offer_id, available, values in offers:
+            parts = [f'<offer id="{offer_id}" available="{"true" if available else "false"}">']
+            for name, value in values.items():
+                if name in BASE_FIELDS:
+                    parts.append(f'<{name}>{escape(str(value))}</{name}>')
+                else:
+                    parts.append(f'<param name={quoteattr(name)}>{escape(str(value))}</param>')
+            parts.append('</offer>\n')
+            f.write(''.join(parts))
+        f.write('</offers>\n</shop>\n</yml_catalog>\n')
+
+
+def write_csv(path, offers, fields):
+    import csv
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'available'] + BASE_FIELDS + param_names(fields))
+        for offer_id, available, values in offers:
+            writer.writerow([offer_id, available] + list(values.values()))
+
+
+def write_xlsx(path, offers, fields):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    sheet.append(['id', 'available'] + BASE_FIELDS + param_names(fields))
+    for offer_id, available, values in offers:
+        sheet.append([offer_id, available] + list(values.values()))
+    wb.save(path)
+
+
+def write_json(path, offers):
+    # Массив объектов пишется по одному товару, без сборки списка в памяти
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for number, (offer_id, available, values) in enumerate(offers):
+            record = {'id': offer_id, 'available': available}
+            record.update(values)
+            f.write((',\n' if number else '') + json.dumps(record, ensure_ascii=False))
+        f.write('\n]\n')
+
+
+def generate(path, feed_format, offers, fields, error_rate, seed=0):
+    """Создание фида в формате feed_format ('xml', 'xlsx', 'csv' или 'json')"""
+    if feed_format == 'xlsx' and offers > XLSX_MAX_OFFERS:
+        raise ValueError(f"В XLSX помещается не больше {XLSX_MAX_OFFERS} товаров")
+    rows = iter_offers(offers, fields, error_rate, seed)
+    tmp_path = path + '.tmp'
+    if feed_format == 'xml':
+        write_xml(tmp_path, rows)
+    elif feed_format == 'xlsx':
+        write_xlsx(tmp_path, rows, fields)
+    elif feed_format == 'csv':
+        write_csv(tmp_path, rows, fields)
+    elif feed_format == 'json':
+        write_json(tmp_path, rows)
+    else:
+        raise ValueError(f"Неизвестный формат: {feed_format}")
+    os.replace(tmp_path, path)
+
+
+def feed_path(data_dir, feed_format, offers, fields, error_rate, seed=0):
+    return os.path.join(data_dir, f"feed_{offers}_{fields}_{error_rate:g}_{seed}.{feed_format}")
+
+
+def ensure_feed(data_dir, feed_format, offers, fields, error_rate, seed=0):
+    """Путь к фиду с такими параметрами; фид создается, если его еще нет"""
+    path = feed_path(data_dir, feed_format, offers, fields, error_rate, seed)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        generate(path, feed_format, offers, fields, error_rate, seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация синтетических фидов для замеров")
+    parser.add_argument('--offers', type=int, default=10000, help="число товаров")
+    parser.add_argument('--fields', type=int, default=16,
+                        help=f"число полей товара, не меньше {len(BASE_FIELDS)}")
+    parser.add_argument('--error-rate', type=float, default=0.05,
+                        help="доля товаров с ошибочным значением")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('-o', '--output-dir', default='.', help="каталог для фидов")
+    args = parser.parse_args(argv)
+
+    for feed_format in args.formats:
+        path = feed_path(args.output_dir, feed_format, args.offers, args.fields,
+                         args.error_rate, args.seed)
+        os.makedirs(args.output_dir, exist_ok=True)
+        generate(path, feed_format, args.offers, args.fields, args.error_rate, args.seed)
+        print(path)
+    with open(os.path.join(args.output_dir, f"config_{args.fields}.json"), 'w',
+              encoding='utf-8') as f:
+        json.dump(field_config(args.fields), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
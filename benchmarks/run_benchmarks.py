@@ -0,0 +1,312 @@
+"""Замеры производительности всех путей проверки фидов.
+
+Каждый замер запускается в отдельном процессе, поэтому пиковая память
+(максимальный RSS процесса и его дочерних процессов) относится только к
+нему. Для каждого замера выводятся время, товаров в секунду, МБ фида в
+секунду и пиковая память. Результаты можно дописывать в файл JSON Lines
+(--output) и сравнивать с прошлым прогоном (--baseline): замедление больше
+порога отмечается как регрессия.
+
+Коды возврата:
+    0 - все замеры выполнены, регрессий нет
+    1 - найдены регрессии или хотя бы один замер завершился ошибкой
+
+Пример:
+    python benchmarks/run_benchmarks.py --offers 10000 100000 --fields 16 \\
+        --output results.jsonl --baseline previous.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+FEED_ERROR_CORRECTION_DIR = os.path.join(ROOT_DIR, 'FeedErrorCorrection')
+# Редактор форматов (main.py, feed_validator...) и FeedErrorCorrection
+sys.path[:0] = [BENCHMARKS_DIR, ROOT_DIR, FEED_ERROR_CORRECTION_DIR]
+
+from feed_generator import FORMATS, XLSX_MAX_OFFERS, ensure_feed, field_config, validator_rules
+
+# Замер -> форматы фидов, на которых он выполняется
+CASES = {
+    'MainWindow.validate_xml': ['xml'],
+    'MainWindow.validate_xlsx': ['xlsx'],
+    'MainWindow.check_condition': ['xml'],
+    'DataParser.parse_file': ['csv', 'xlsx', 'xml', 'json'],
+    # XML не поддерживается: FileParser.read_xml оставляет все значения
+    # строками, и проверка цены (price <= 0) всегда падает с TypeError;
+    # экспорт исправленного XML в FileParser тоже не реализован
+    'FileParser.process_feed': ['csv', 'xlsx'],
+    'Validator.validate': ['csv', 'xlsx', 'xml', 'json'],
+    'Validator.validate_chunks': ['csv', 'xlsx', 'xml', 'json'],
+}
+
+# Замеры, на которые влияют --workers и --columnar
+ENGINE_CASES = ('MainWindow.validate_xml', 'MainWindow.validate_xlsx',
+                'Validator.validate', 'Validator.validate_chunks')
+
+
+# Замедление (в долях), начиная с которого результат считается регрессией
+REGRESSION_THRESHOLD = 0.10
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'feed_benchmarks')
+
+
+def peak_memory_mb():
+    """Пиковая память этого процесса и его дочерних процессов, МБ"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2 ** 20
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # В Linux ru_maxrss в килобайтах, в macOS - в байтах
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def run_validate_feed(path, fields, options, read_values):
+    """Путь MainWindow.validate_xml/validate_xlsx: чтение, проверка и отчет,
+    как в ValidationWorker, только без окна и фонового потока"""
+    from feed_validator import validate_offers, fields_conditions_from_config, Report
+    from rule_plan import RulePlan
+
+    fields_conditions = fields_conditions_from_config(field_config(fields))
+    offers = read_values(path, list(fields_conditions))
+    report = Report(RulePlan(fields_conditions))
+    started = time.perf_counter()
+    for label, offer_errors in validate_offers(fields_conditions, offers, options['workers'],
+                                               columnar=options['columnar']):
+        report.add(label, offer_errors)
+    return time.perf_counter() - started, report.total_offers
+
+
+def run_case(case, path, fields, options):
+    """Выполнение замера: (время в секундах, число товаров)"""
+    if case == 'MainWindow.validate_xml':
+        from feed_reader import iter_xml_values
+        return run_validate_feed(path, fields, options, iter_xml_values)
+
+    if case == 'MainWindow.validate_xlsx':
+        from feed_reader import iter_xlsx_values
+        return run_validate_feed(path, fields, options, iter_xlsx_values)
+
+    if case == 'MainWindow.check_condition':
+        from feed_reader import iter_xml_values
+        from feed_validator import fields_conditions_from_config
+        from main import MainWindow
+
+        fields_conditions = fields_conditions_from_config(field_config(fields))
+        offers = [values for _, values in iter_xml_values(path, list(fields_conditions))]
+        checks = [(name, field_info['type'], field_info['conditions'])
+                  for name, field_info in fields_conditions.items()]
+        # check_condition не обращается к состоянию окна, создавать его не нужно
+        check_condition = MainWindow.check_condition
+        started = time.perf_counter()
+        for values in offers:
+            for name, field_type, conditions in checks:
+                value = values.get(name)
+                if value is None:
+                    continue
+                for condition in conditions:
+                    check_condition(None, value, condition, field_type)
+        return time.perf_counter() - started, len(offers)
+
+    if case == 'DataParser.parse_file':
+        from data_parser import DataParser
+        started = time.perf_counter()
+        data = DataParser.parse_file(path)
+        return time.perf_counter() - started, len(data)
+
+    if case == 'FileParser.process_feed':
+        from file_parser import FileParser
+        file_parser = FileParser(path)
+        started = time.perf_counter()
+        if path.endswith('.csv'):
+            file_parser.read_csv()
+        else:
+            file_parser.read_xlsx()
+        file_parser.process_feed(path)
+        offers = len(file_parser.data) if file_parser.data is not None else 0
+        return time.perf_counter() - started, offers
+
+    if case == 'Validator.validate':
+        from data_parser import DataParser
+        from validator import Validator
+        data = DataParser.parse_file(path)
+        started = time.perf_counter()
+        Validator(validator_rules(), workers=options['workers']).validate(data)
+        return time.perf_counter() - started, len(data)
+
+    if case == 'Validator.validate_chunks':
+        from data_parser import DataParser
+        from validator import Validator
+        offers = 0
+        started = time.perf_counter()
+        validator = Validator(validator_rules(), workers=options['workers'])
+
+        def chunks():
+            nonlocal offers
+            for chunk in DataParser.iter_chunks(path):
+                offers += len(chunk)
+                yield chunk
+
+        validator.validate_chunks(chunks())
+        return time.perf_counter() - started, offers
+
+    raise ValueError(f"Неизвестный замер: {case}")
+
+
+def run_child(case, path, fields, options):
+    """Замер внутри дочернего процесса; результат - одна строка JSON в stdout"""
+    result = {}
+    # FileParser и другие модули печатают ход работы, он не нужен в выводе
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            seconds, offers = run_case(case, path, fields, options)
+            result = {'seconds': seconds, 'offers': offers}
+        except Exception as e:
+            result = {'error': f"{type(e).__name__}: {e}"}
+    result['peak_mb'] = peak_memory_mb()
+    print(json.dumps(result))
+
+
+def run_isolated(case, path, fields, options):
+    """Запуск замера в отдельном процессе и во временном каталоге
+    (FileParser.process_feed пишет исправленный фид в текущий каталог)"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', case, path,
+               '--fields', str(fields), '--workers', str(options['workers'])]
+    if options['columnar']:
+        command.append('--columnar')
+    with tempfile.TemporaryDirectory() as work_dir:
+        completed = subprocess.run(command, cwd=work_dir, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        message = completed.stderr.strip().splitlines()
+        return {'error': message[-1] if message else f"код возврата {completed.returncode}"}
+    return json.loads(lines[-1])
+
+
+def record_key(record):
+    key = (record['case'], record['format'], record['offers_requested'], record['fields'])
+    if record['case'] in ENGINE_CASES:
+        key += (record['workers'], record['columnar'])
+    return key
+
+
+def load_baseline(filename):
+    """Последний результат каждого замера из файла JSON Lines"""
+    baseline = {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if 'seconds' in record:
+                    baseline[record_key(record)] = record
+    return baseline
+
+
+def format_row(record, baseline):
+    name = f"{record['case']} [{record['format']}, {record['offers_requested']}]"
+    if 'error' in record:
+        return f"{name:<55} ошибка: {record['error']}"
+    peak = f"{record['peak_mb']:.0f} МБ" if record.get('peak_mb') is not None else "-"
+    line = (f"{name:<55} {record['seconds']:9.3f} с {record['offers_per_second']:12.0f} тов/с "
+            f"{record['mb_per_second']:8.1f} МБ/с  пик {peak}")
+    previous = baseline.get(record_key(record))
+    if previous is not None and previous['seconds'] > 0:
+        change = record['seconds'] / previous['seconds'] - 1
+        line += f"  {change:+.1%}"
+        if change > REGRESSION_THRESHOLD:
+            line += " РЕГРЕССИЯ"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Замеры скорости и памяти проверки фидов на синтетических данных",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="Замеры: " + ", ".join(CASES)
+    )
+    parser.add_argument('--offers', type=int, nargs='+', default=[10000],
+                        help="размеры фидов в товарах (например 10000 1000000 10000000)")
+    parser.add_argument('--fields', type=int, default=16, help="число полей товара")
+    parser.add_argument('--error-rate', type=float, default=0.05,
+                        help="доля товаров с ошибками")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="число процессов для validate_xml/validate_xlsx и Validator")
+    parser.add_argument('--columnar', action='store_true',
+                        help="колоночная проверка для validate_xml/validate_xlsx")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="каталог для сгенерированных фидов (используются повторно)")
+    parser.add_argument('-o', '--output', help="дописать результаты в файл JSON Lines")
+    parser.add_argument('--baseline', help="файл JSON Lines с прошлыми результатами для сравнения")
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'FEED'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    options = {'workers': args.workers, 'columnar': args.columnar}
+    if args.child:
+        run_child(args.child[0], args.child[1], args.fields, options)
+        return 0
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    out = open(args.output, 'a', encoding='utf-8') if args.output else None
+    regressions = 0
+    failures = 0
+    try:
+        for offers in args.offers:
+            for case in args.cases:
+                for feed_format in CASES[case]:
+                    if feed_format not in args.formats:
+                        continue
+                    if feed_format == 'xlsx' and offers > XLSX_MAX_OFFERS:
+                        print(f"{case} [xlsx, {offers}]: пропущен, в XLSX не больше "
+                              f"{XLSX_MAX_OFFERS} строк")
+                        continue
+                    path = ensure_feed(args.data_dir, feed_format, offers, args.fields,
+                                       args.error_rate)
+                    record = {
+                        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'case': case,
+                        'format': feed_format,
+                        'offers_requested': offers,
+                        'fields': args.fields,
+                        'error_rate': args.error_rate,
+                        'workers': args.workers,
+                        'columnar': args.columnar,
+                        'file_mb': os.path.getsize(path) / 2 ** 20,
+                    }
+                    record.update(run_isolated(case, path, args.fields, options))
+                    if 'seconds' in record:
+                        seconds = max(record['seconds'], 1e-9)
+                        record['offers_per_second'] = record['offers'] / seconds
+                        record['mb_per_second'] = record['file_mb'] / seconds
+                    line = format_row(record, baseline)
+                    regressions += line.endswith("РЕГРЕССИЯ")
+                    failures += 'error' in record
+                    print(line, flush=True)
+                    if out is not None:
+                        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        out.flush()
+    finally:
+        if out is not None:
+            out.close()
+    if failures:
+        print(f"Замеров с ошибкой: {failures}", file=sys.stderr)
+    return 1 if regressions or failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
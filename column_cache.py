@@ -0,0 +1,277 @@
+"""Кэш извлеченных значений фида на диске, по столбцам.
+
+Разбор XML/XLSX занимает большую часть времени проверки, а значения полей
+не зависят от условий. Поэтому значения каждого поля сохраняются в свой
+файл столбца, и следующая проверка того же файла с любой конфигурацией
+читает нужные столбцы вместо разбора. Если каких-то полей в кэше нет, фид
+разбирается только ради них, и их столбцы добавляются в кэш.
+
+Записи кэша лежат в отдельных каталогах по хэшу пути к фиду и действуют,
+пока совпадают размер, время изменения и отпечаток содержимого файла.
+
+Формат файла столбца (все числа little-endian):
+    заголовок: MAGIC, число товаров n, число уникальных значений u;
+    u + 1 смещений ('q') уникальных значений в блоке текста;
+    n кодов ('i'): номер уникального значения, -1 - поле не найдено;
+    блок текста: уникальные значения в UTF-8 подряд.
+Коды и смещения читаются через mmap без копирования, значения декодируются
+по мере чтения, так что память не зависит от числа уникальных значений.
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.feed_validator_columns')
+
+MAGIC = b'FVC1'
+HEADER = struct.Struct('<4s4xqq')
+MANIFEST = 'manifest.json'
+LABELS_FILE = 'labels.col'
+
+# Меняется при изменении формата или способа чтения фидов
+CACHE_VERSION = 1
+
+# Отпечаток содержимого строится по блокам такого размера в начале,
+# середине и конце файла, чтобы не читать файл целиком
+FINGERPRINT_BLOCK = 1 << 20
+
+
+def fingerprint(filename):
+    """Отпечаток содержимого файла: хэш размера и трех блоков"""
+    size = os.path.getsize(filename)
+    digest = hashlib.blake2b(str(size).encode('ascii'), digest_size=16)
+    with open(filename, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - FINGERPRINT_BLOCK // 2),
+                              max(0, size - FINGERPRINT_BLOCK)}):
+            f.seek(offset)
+            digest.update(f.read(FINGERPRINT_BLOCK))
+    return digest.hexdigest()
+
+
+def feed_key(filename):
+    """Путь, размер, время изменения и отпечаток фида"""
+    stat = os.stat(filename)
+    return {
+        'version': CACHE_VERSION,
+        'path': os.path.abspath(filename),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'fingerprint': fingerprint(filename),
+    }
+
+
+class ColumnWriter:
+    """Накопление одного столбца с кодированием повторяющихся значений.
+
+    Уникальные значения сразу дописываются во временный файл, в памяти
+    остаются только коды, смещения и словарь последних DEDUP_LIMIT значений.
+    Значение, вытесненное из словаря, при повторе записывается еще раз:
+    столбец немного больше, зато память не зависит от числа уникальных значений.
+    """
+    DEDUP_LIMIT = 65536
+
+    def __init__(self):
+        self.codes = array('i')
+        self.offsets = array('q', [0])
+        self._unique_codes = {}
+        self._blob = tempfile.TemporaryFile()
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self._unique_codes.get(value)
+        if code is None:
+            if len(self._unique_codes) >= self.DEDUP_LIMIT:
+                self._unique_codes.clear()
+            encoded = value.encode('utf-8', 'surrogatepass')
+            self._blob.write(encoded)
+            code = self._unique_codes[value] = len(self.offsets) - 1
+            self.offsets.append(self.offsets[-1] + len(encoded))
+        self.codes.append(code)
+
+    def write(self, path):
+        offsets = self.offsets
+        codes = self.codes
+        if sys.byteorder != 'little':
+            offsets = array('q', offsets)
+            offsets.byteswap()
+            codes = array('i', codes)
+            codes.byteswap()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self.codes), len(self.offsets) - 1))
+            f.write(offsets.tobytes())
+            f.write(codes.tobytes())
+            self._blob.seek(0)
+            shutil.copyfileobj(self._blob, f)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self._blob.close()
+
+
+class ColumnReader:
+    """Столбец из файла через mmap: коды и смещения не копируются, значения
+    декодируются при чтении, недавние - из кэша на DECODE_CACHE_SIZE значений"""
+    DECODE_CACHE_SIZE = 65536
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self.codes = None
+        try:
+            magic, self.count, unique_count = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: не файл столбца")
+            offsets_start = HEADER.size
+            codes_start = offsets_start + (unique_count + 1) * 8
+            self._blob_start = codes_start + self.count * 4
+            if len(self._mmap) < self._blob_start:
+                raise ValueError(f"{path}: файл столбца поврежден")
+            view = memoryview(self._mmap)
+            self.offsets = view[offsets_start:codes_start].cast('q')
+            self.codes = view[codes_start:self._blob_start].cast('i')
+            view.release()
+            if sys.byteorder != 'little':
+                for name in ('offsets', 'codes'):
+                    mapped = getattr(self, name)
+                    copied = array(mapped.format, mapped)
+                    copied.byteswap()
+                    mapped.release()
+                    setattr(self, name, copied)
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def value(self, code):
+        """Уникальное значение с номером code; None для -1"""
+        if code < 0:
+            return None
+        start = self._blob_start + self.offsets[code]
+        end = self._blob_start + self.offsets[code + 1]
+        return str(self._mmap[start:end], 'utf-8', 'surrogatepass')
+
+    def values(self):
+        cache = {}
+        value = self.value
+        for code in self.codes:
+            decoded = cache.get(code)
+            if decoded is None:
+                if len(cache) >= self.DECODE_CACHE_SIZE:
+                    cache.clear()
+                decoded = cache[code] = value(code)
+            yield decoded
+
+    def close(self):
+        for mapped in (self.offsets, self.codes):
+            if isinstance(mapped, memoryview):
+                mapped.release()
+        self._mmap.close()
+
+
+class ColumnCache:
+    """Каталог кэша столбцов для всех фидов"""
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def entry_dir(self, filename):
+        path = os.path.abspath(filename)
+        name = hashlib.blake2b(path.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, name)
+
+    def _load_manifest(self, entry_dir, key):
+        try:
+            with open(os.path.join(entry_dir, MANIFEST), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('key') != key:
+            return None
+        return manifest
+
+    def _save_manifest(self, entry_dir, manifest):
+        path = os.path.join(entry_dir, MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    def iter_values(self, filename, field_names, read_values):
+        """Пары (подпись товара, значения полей), как у read_values.
+
+        read_values(filename, field_names) - обычное чтение фида, например
+        iter_xml_values. Оно вызывается только для полей, которых нет в кэше;
+        новые столбцы сохраняются, если поток прочитан до конца.
+        """
+        key = feed_key(filename)
+        entry_dir = self.entry_dir(filename)
+        manifest = self._load_manifest(entry_dir, key)
+        if manifest is None:
+            # Фид изменился или еще не читался: старые столбцы не нужны
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            manifest = {'key': key, 'count': None, 'columns': {}}
+
+        columns = manifest['columns']
+        cached_names = [name for name in field_names if name in columns]
+        missing_names = [name for name in dict.fromkeys(field_names) if name not in columns]
+
+        readers = []
+        cached = []
+        writers = {}
+        label_writer = None
+        try:
+            # Подписи товаров хранятся отдельно от столбцов полей и есть в
+            # кэше после первого полного чтения, даже без полей
+            labels = None
+            if manifest['count'] is not None:
+                labels = ColumnReader(os.path.join(entry_dir, LABELS_FILE))
+                readers.append(labels)
+            for name in cached_names:
+                reader = ColumnReader(os.path.join(entry_dir, columns[name]))
+                readers.append(reader)
+                cached.append((name, reader.values()))
+
+            if labels is not None and not missing_names:
+                for label in labels.values():
+                    yield label, {name: next(column) for name, column in cached}
+                return
+
+            writers = {name: ColumnWriter() for name in missing_names}
+            label_writer = ColumnWriter() if labels is None else None
+            for label, values in read_values(filename, missing_names):
+                if label_writer is not None:
+                    label_writer.append(label)
+                for name, writer in writers.items():
+                    writer.append(values[name])
+                for name, column in cached:
+                    values[name] = next(column)
+                yield label, values
+
+            # Поток прочитан до конца: сохраняем новые столбцы
+            os.makedirs(entry_dir, exist_ok=True)
+            if label_writer is not None:
+                label_writer.write(os.path.join(entry_dir, LABELS_FILE))
+                manifest['count'] = len(label_writer.codes)
+            for name, writer in writers.items():
+                column_file = f"{len(columns)}.col"
+                writer.write(os.path.join(entry_dir, column_file))
+                columns[name] = column_file
+            self._save_manifest(entry_dir, manifest)
+        finally:
+            for _, column in cached:
+                column.close()
+            for reader in readers:
+                reader.close()
+            for writer in writers.values():
+                writer.close()
+            if label_writer is not None:
+                label_writer.close()
@@ -0,0 +1,144 @@
+"""Колоночная проверка пачки товаров.
+
+Значения каждого поля собираются в столбец, и каждое условие считается
+одной векторной маской по всему столбцу. Маска отбирает кандидатов в ошибки
+с запасом, а текст ошибки для отобранных значений строит та же проверка из
+rule_plan, поэтому отчёт совпадает с построчной проверкой.
+"""
+import re
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+from rule_plan import (DATE_FORMATS, FAST_DATE_PATTERNS, MISSING, LengthCheck, MaskCheck, IntRangeCheck,
+                       FloatRangeCheck, DateRangeCheck, PrecisionCheck)
+
+# Строковые операции над столбцами требуют numpy 2 (np.strings и StringDType)
+COLUMNAR_AVAILABLE = pd is not None and hasattr(np, 'strings')
+
+# Относительный запас у границ диапазона: значения рядом с границей
+# перепроверяются точно, чтобы разбор numpy не расходился с float()
+BOUND_MARGIN = 1e-9
+
+# Числа в самой простой записи. numpy и pandas разбирают строки не так, как
+# float() и strptime (например, принимают '5\x00' или секунду 60), поэтому
+# векторно разбираются только значения строгого вида, а все остальные
+# перепроверяются точной проверкой
+NUMBER_PATTERN = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?', re.ASCII)
+
+
+def _outside(numbers, low, high):
+    low_margin = BOUND_MARGIN * max(1.0, abs(low))
+    high_margin = BOUND_MARGIN * max(1.0, abs(high))
+    return np.isnan(numbers) | (numbers < low + low_margin) | (numbers > high - high_margin)
+
+
+def _length_mask(check, column):
+    lengths = np.strings.str_len(column)
+    return (lengths < check.min) | (lengths > check.max)
+
+
+def _mask_mask(check, column):
+    matches = np.fromiter(map(check.regex.fullmatch, column), dtype=object, count=len(column))
+    return np.equal(matches, None)
+
+
+def _full_matches(pattern, column):
+    """Маска значений, целиком подходящих под выражение; каждое уникальное
+    значение сверяется один раз"""
+    codes, uniques = pd.factorize(column.astype(object))
+    matches = np.fromiter((pattern.fullmatch(value) is not None for value in uniques),
+                          dtype=bool, count=len(uniques))
+    return matches[codes]
+
+
+def _range_mask(check, column):
+    if check.bounds_error is not None:
+        return None
+    normalized = np.strings.replace(column, ',', '.')
+    strict = _full_matches(NUMBER_PATTERN, normalized)
+    numbers = np.where(strict, normalized, '0').astype(np.float64)
+    return ~strict | _outside(numbers, check.min, check.max)
+
+
+def _date_mask(check, column):
+    if check.bounds_error is not None:
+        return None
+    # Секунды вмещают любой год от 1 до 9999, в наносекундах такие даты не помещаются
+    parsed = pd.Series(pd.NaT, index=range(len(column)), dtype='datetime64[s]')
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna().to_numpy()
+        if not missing.any():
+            break
+        # Только строки, которые strptime заведомо разбирает в этом формате;
+        # остальные (NaT) проверяются точно
+        pattern, _ = FAST_DATE_PATTERNS[date_format]
+        selected = missing & _full_matches(pattern, column)
+        if not selected.any():
+            continue
+        dates = pd.to_datetime(column[selected].astype(object), format=date_format, errors='coerce')
+        parsed[selected] = np.asarray(dates, dtype='datetime64[s]')
+    dates = parsed.dt.normalize()
+    mask = dates.isna() | (dates < pd.Timestamp(check.min)) | (dates > pd.Timestamp(check.max))
+    return mask.to_numpy(dtype=bool)
+
+
+def _precision_mask(check, column):
+    # Длина части после последней точки или запятой
+    separator = np.maximum(np.strings.rfind(column, '.'), np.strings.rfind(column, ','))
+    decimal_places = np.strings.str_len(column) - separator - 1
+    return (separator >= 0) & (decimal_places > check.precision)
+
+
+CANDIDATE_MASKS = {
+    LengthCheck: _length_mask,
+    MaskCheck: _mask_mask,
+    IntRangeCheck: _range_mask,
+    FloatRangeCheck: _range_mask,
+    DateRangeCheck: _date_mask,
+    PrecisionCheck: _precision_mask,
+}
+
+
+def candidate_positions(check, column):
+    """Позиции значений столбца, которые могут не пройти проверку"""
+    mask_function = CANDIDATE_MASKS.get(type(check))
+    mask = None
+    if mask_function is not None:
+        try:
+            mask = mask_function(check, column)
+        except Exception:
+            # Например, граница не того типа: такие значения проверяем по одному
+            mask = None
+    if mask is None:
+        return range(len(column))
+    return np.flatnonzero(mask)
+
+
+def check_batch_columnar(plan, batch):
+    """Проверка пачки словарей значений; результат как у check_offer для каждого товара"""
+    offer_errors = [[] for _ in batch]
+    for field_index, field in enumerate(plan):
+        values = [offer_values.get(field.name) for offer_values in batch]
+        present = [position for position, value in enumerate(values) if value is not None]
+
+        if len(present) < len(values):
+            for position, value in enumerate(values):
+                if value is None:
+                    offer_errors[position].append((field_index, MISSING, None))
+        if not present or not field.checks:
+            continue
+
+        column = np.array([values[position] for position in present], dtype=np.dtypes.StringDType())
+        # Ошибки поля по товарам в порядке условий
+        for check_index, check in enumerate(field.checks):
+            for position in candidate_positions(check, column):
+                value = values[present[position]]
+                if check(value):
+                    offer_errors[present[position]].append((field_index, check_index, value))
+
+    return offer_errors
@@ -0,0 +1,135 @@
+import xml.etree.ElementTree as ET
+from openpyxl import load_workbook
+
+# Символы, при которых имя поля разбирается ElementPath как путь, а не как тег
+PATH_CHARS = frozenset('/*[]@()')
+
+
+def is_path_name(name):
+    """Нужен ли для поиска поля offer.find, а не индекс дочерних тегов"""
+    return name.startswith('.') or not PATH_CHARS.isdisjoint(name)
+
+
+def index_offer(offer, path_names=()):
+    """Индекс значений товара: имя тега или name у <param> → текст.
+
+    Строится за один проход по дочерним элементам. Как и раньше, прямой
+    дочерний тег имеет приоритет над <param>, а из повторяющихся берётся
+    первый. Поля-пути из path_names ищутся через offer.find.
+    """
+    tags = {}
+    params = {}
+    for child in offer:
+        tag = child.tag
+        if tag not in tags:
+            tags[tag] = child.text
+        if tag == 'param':
+            name = child.get('name')
+            if name not in params:
+                params[name] = child.text
+
+    for name in path_names:
+        elem = offer.find(name)
+        if elem is not None:
+            tags[name] = elem.text
+
+    params.update(tags)
+    return params
+
+
+def iter_xml_offers(filename):
+    """Потоковое чтение товаров из XML файла.
+
+    Каждый <offer> из первого тега <offers> отдаётся сразу после закрывающего
+    тега и затем освобождается, поэтому потребление памяти не зависит от
+    размера файла.
+    """
+    offers_tag = None
+    current_offer = None
+    path = []
+
+    for event, elem in ET.iterparse(filename, events=('start', 'end')):
+        if event == 'start':
+            # Аналог root.find('.//offers'): первый потомок корня в порядке документа
+            if offers_tag is None and path and elem.tag == 'offers':
+                offers_tag = elem
+            elif current_offer is None and elem.tag == 'offer' and path and path[-1] is offers_tag:
+                current_offer = elem
+            path.append(elem)
+            continue
+
+        path.pop()
+        if elem is current_offer:
+            yield elem
+            current_offer = None
+            offers_tag.remove(elem)
+            elem.clear()
+        elif current_offer is None and elem is not offers_tag and path:
+            # Всё, что не относится к товарам, сразу освобождаем
+            elem.clear()
+            if path[-1] is offers_tag:
+                offers_tag.remove(elem)
+
+    if offers_tag is None:
+        raise ValueError("Тег <offers> не найден в файле")
+
+
+def iter_xml_values(filename, field_names, sample=None):
+    """Пары (подпись товара, значения полей) для всех товаров XML файла.
+
+    С sample (OfferSample) отдаются только товары выборки, и индексируются
+    только они.
+    """
+    path_names = [name for name in field_names if is_path_name(name)]
+
+    def offer_values(offer):
+        # Один раз индексируем теги и param товара
+        values = index_offer(offer, path_names)
+        offer_id = offer.get('id', 'Неизвестный ID')
+        return f"ID: {offer_id}", {name: values.get(name) for name in field_names}
+
+    if sample is not None:
+        yield from sample(iter_xml_offers(filename), offer_values)
+    else:
+        yield from map(offer_values, iter_xml_offers(filename))
+
+
+def iter_xlsx_values(filename, field_names, sample=None):
+    """Пары (подпись товара, значения полей) для всех строк XLSX файла.
+
+    Строки читаются потоково и только как значения, без объектов ячеек;
+    в памяти хранится лишь текущая строка. С sample (OfferSample) в значения
+    разбираются только строки выборки.
+    """
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        rows = sheet.iter_rows(values_only=True)
+
+        # Получаем заголовки (названия полей)
+        headers = [str(value) if value is not None else "" for value in next(rows, ())]
+
+        # Номер столбца каждого поля определяем один раз по заголовкам;
+        # при повторе заголовка используется последний столбец
+        header_columns = {header: col_idx for col_idx, header in enumerate(headers)}
+        field_columns = [(name, header_columns.get(name)) for name in field_names]
+
+        def row_values(numbered_row):
+            row_idx, row = numbered_row
+            row_length = len(row)
+            values = {}
+            for name, col_idx in field_columns:
+                if col_idx is None or col_idx >= row_length:
+                    values[name] = None
+                else:
+                    value = row[col_idx]
+                    values[name] = str(value) if value is not None else ""
+            return f"строка {row_idx}", values
+
+        rows = enumerate(rows, start=2)  # start=2 так как первая строка - заголовки
+        if sample is not None:
+            yield from sample(rows, row_values)
+        else:
+            yield from map(row_values, rows)
+    finally:
+        wb.close()
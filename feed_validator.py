@@ -0,0 +1,387 @@
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from columnar_checks import COLUMNAR_AVAILABLE, check_batch_columnar
+from rule_plan import MISSING, RulePlan
+from sampling import wilson_interval
+
+# Сколько товаров отправляется в рабочий процесс за один раз
+BATCH_SIZE = 2000
+
+# Название условия для ошибки "поле не найдено" в таблицах и сводке
+MISSING_CONDITION = "Наличие поля"
+
+
+def fields_conditions_from_config(config):
+    """Поля и их условия из конфигурации, сохраненной редактором в JSON"""
+    fields_conditions = {}
+    for field in config:
+        fields_conditions[field['name']] = {
+            'type': field['type'],
+            'conditions': [
+                {
+                    'type': condition['type'],
+                    'field_type': field['type'],
+                    'values': condition['values']
+                }
+                for condition in field['conditions']
+            ]
+        }
+    return fields_conditions
+
+
+def check_offer(plan, values):
+    """Проверка одного товара: список ошибок (номер поля, номер проверки, значение).
+
+    Для ненайденного поля номер проверки равен MISSING, а значение - None.
+    """
+    offer_errors = []
+    for field_index, field in enumerate(plan):
+        field_value = values.get(field.name)
+
+        if field_value is None:
+            offer_errors.append((field_index, MISSING, None))
+            continue
+
+        # Проверяем каждое условие для поля
+        for check_index in field.failed_checks(field_value):
+            offer_errors.append((field_index, check_index, field_value))
+    return offer_errors
+
+
+def format_error(field_name, error):
+    """Строка отчёта для одной ошибки"""
+    if error is None:
+        return f"  - Поле '{field_name}' не найдено"
+    return f"  - Поле '{field_name}': {error}"
+
+
+def check_batch(plan, batch, columnar=False):
+    """Проверка пачки словарей значений: список ошибок для каждого товара"""
+    if columnar:
+        return check_batch_columnar(plan, batch)
+    return [check_offer(plan, values) for values in batch]
+
+
+# План проверки внутри рабочего процесса, компилируется один раз при старте
+_worker_plan = None
+_worker_columnar = False
+
+
+def _init_worker(fields_conditions, columnar):
+    global _worker_plan, _worker_columnar
+    _worker_plan = RulePlan(fields_conditions)
+    _worker_columnar = columnar
+
+
+def _check_batch(batch):
+    return check_batch(_worker_plan, batch, _worker_columnar)
+
+
+def validate_offers(fields_conditions, offers, workers=1, batch_size=BATCH_SIZE, columnar=False):
+    """Проверка потока товаров.
+
+    offers - итератор пар (подпись товара, словарь значений полей).
+    Отдаёт пары (подпись товара, список ошибок) в исходном порядке. При
+    workers > 1 товары проверяются пачками в пуле процессов, при columnar
+    каждая пачка проверяется векторно по столбцам (нужны numpy и pandas).
+    Результат во всех режимах совпадает с последовательной проверкой.
+    """
+    if columnar and not COLUMNAR_AVAILABLE:
+        raise RuntimeError("Для колоночной проверки нужны numpy и pandas")
+
+    offers = iter(offers)
+    if workers <= 1:
+        plan = RulePlan(fields_conditions)
+        if not columnar:
+            for label, values in offers:
+                yield label, check_offer(plan, values)
+            return
+        while True:
+            batch = list(islice(offers, batch_size))
+            if not batch:
+                break
+            offer_errors = check_batch(plan, [values for _, values in batch], columnar)
+            yield from zip((label for label, _ in batch), offer_errors)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(fields_conditions, columnar)) as pool:
+        # Ограничиваем число пачек в работе, чтобы не читать весь файл в память
+        pending = deque()
+        while True:
+            batch = list(islice(offers, batch_size))
+            if batch:
+                labels = [label for label, _ in batch]
+                future = pool.submit(_check_batch, [values for _, values in batch])
+                pending.append((labels, future))
+            if pending and (not batch or len(pending) >= workers * 2):
+                labels, future = pending.popleft()
+                yield from zip(labels, future.result())
+            if not batch and not pending:
+                break
+
+
+class Report:
+    """Итоги проверки и ошибки в компактном виде.
+
+    Ошибка хранится в массивах как номер поля, номер проверки и ссылка на
+    значение в таблице уникальных значений. Текст ошибки заново получается
+    из проверки плана только тогда, когда строку нужно показать или выгрузить.
+    """
+    def __init__(self, plan):
+        self.plan = plan
+        self.total_offers = 0
+        self.offers_with_errors = 0
+        # Товары с ошибками: подпись, порядковый номер в фиде, первая ошибка
+        self.offer_labels = []
+        self.offer_numbers = array('q')
+        self.offer_starts = array('q')
+        # Ошибки
+        self.error_fields = array('i')
+        self.error_checks = array('i')
+        self.error_values = array('q')
+        # Число ошибок, записанных во все массивы. Окно читает отчет во время
+        # проверки, поэтому видны только ошибки до этой границы
+        self.error_count = 0
+        self.values = []
+        self._value_ids = {}
+
+    def add(self, label, offer_errors):
+        """Учитывает товар; возвращает True, если у него есть ошибки"""
+        offer_number = self.total_offers
+        self.total_offers += 1
+        # Сохраняем только товары с ошибками
+        if not offer_errors:
+            return False
+
+        self.offers_with_errors += 1
+        self.offer_labels.append(label)
+        self.offer_numbers.append(offer_number)
+        self.offer_starts.append(len(self.error_fields))
+        for field_index, check_index, value in offer_errors:
+            self.error_fields.append(field_index)
+            self.error_checks.append(check_index)
+            self.error_values.append(self._value_id(value))
+        self.error_count = len(self.error_fields)
+        return True
+
+    def _value_id(self, value):
+        if value is None:
+            return -1
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = self._value_ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def __len__(self):
+        return self.error_count
+
+    def error_offer(self, error_index):
+        """Номер товара с ошибками (в offer_labels), к которому относится ошибка"""
+        return bisect_right(self.offer_starts, error_index) - 1
+
+    def error_value(self, error_index):
+        value_id = self.error_values[error_index]
+        return self.values[value_id] if value_id >= 0 else None
+
+    def field(self, error_index):
+        return self.plan.fields[self.error_fields[error_index]]
+
+    def condition(self, error_index):
+        """Тип условия, которое не прошло значение; None, если поле не найдено"""
+        check_index = self.error_checks[error_index]
+        if check_index == MISSING:
+            return None
+        return self.field(error_index).check_types[check_index]
+
+    def message(self, error_index):
+        """Текст ошибки; None, если поле не найдено"""
+        return self.field(error_index).message(self.error_checks[error_index],
+                                               self.error_value(error_index))
+
+    def error_line(self, error_index):
+        return format_error(self.field(error_index).name, self.message(error_index))
+
+    def offer_errors(self, offer_index):
+        """Номера ошибок товара с ошибками"""
+        start = self.offer_starts[offer_index]
+        if offer_index + 1 < len(self.offer_starts):
+            return range(start, self.offer_starts[offer_index + 1])
+        return range(start, self.error_count)
+
+    def offer_lines(self, offer_index):
+        """Строки отчёта по одному товару с ошибками"""
+        lines = [f"\nТовар ({self.offer_labels[offer_index]}):"]
+        lines.extend(self.error_line(error_index) for error_index in self.offer_errors(offer_index))
+        return lines
+
+    def iter_errors(self):
+        """Ошибки по порядку: (подпись товара, имя поля, текст ошибки или None)"""
+        for offer_index, label in enumerate(self.offer_labels):
+            for error_index in self.offer_errors(offer_index):
+                yield label, self.field(error_index).name, self.message(error_index)
+
+    def lines(self, start=0, stop=None):
+        """Строки подробного отчета для товаров с ошибками с start по stop"""
+        if stop is None:
+            stop = len(self.offer_labels)
+        for offer_index in range(start, stop):
+            yield from self.offer_lines(offer_index)
+
+    def stats(self):
+        """Статистика, которая выводится в начале отчёта"""
+        stats = offer_stats(self)
+        stats.append("\nПодробный отчет об ошибках:")
+
+        # Если нет ошибок, добавляем сообщение об этом
+        if not self.offers_with_errors:
+            stats.append("\nВсе товары соответствуют заданным условиям!")
+        return stats
+
+    def text(self):
+        """Полный текст отчета"""
+        return '\n'.join(chain(self.stats(), self.lines()))
+
+
+class ErrorSummary:
+    """Сводка проверки без списка ошибок по каждому товару.
+
+    Хранит точные счётчики по парам (поле, условие) и по типам условий и не
+    больше examples_limit первых примеров на пару, так что память зависит
+    только от числа условий. Интерфейс добавления тот же, что у Report.
+
+    Если сводка построена по случайной выборке, в population записывается
+    число товаров в фиде, и доли ошибок выводятся как оценки с 95%
+    доверительным интервалом.
+    """
+    EXAMPLES_LIMIT = 5
+
+    def __init__(self, plan, examples_limit=EXAMPLES_LIMIT):
+        self.plan = plan
+        self.examples_limit = examples_limit
+        self.total_offers = 0
+        self.offers_with_errors = 0
+        self.error_count = 0
+        # (номер поля, номер проверки) -> число ошибок
+        self.rule_counts = {}
+        # Тип условия -> число ошибок
+        self.kind_counts = {}
+        # (номер поля, номер проверки) -> первые примеры (подпись товара, значение)
+        self.examples = {}
+        # Число товаров в фиде, если проверялась только выборка
+        self.population = None
+
+    def add(self, label, offer_errors):
+        """Учитывает товар; возвращает True, если у него есть ошибки"""
+        self.total_offers += 1
+        if not offer_errors:
+            return False
+
+        self.offers_with_errors += 1
+        self.error_count += len(offer_errors)
+        for field_index, check_index, value in offer_errors:
+            rule = (field_index, check_index)
+            count = self.rule_counts.get(rule, 0)
+            self.rule_counts[rule] = count + 1
+            if count < self.examples_limit:
+                self.examples.setdefault(rule, []).append((label, value))
+            kind = self.condition(field_index, check_index)
+            self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+        return True
+
+    def __len__(self):
+        return self.error_count
+
+    def condition(self, field_index, check_index):
+        """Тип условия пары; MISSING_CONDITION, если поле не найдено"""
+        if check_index == MISSING:
+            return MISSING_CONDITION
+        return self.plan.fields[field_index].check_types[check_index]
+
+    def rules(self):
+        """Пары (поле, условие) с ошибками в порядке конфигурации"""
+        return sorted(self.rule_counts)
+
+    def share(self, count):
+        """Доля проверенных товаров и границы интервала (для выборки)"""
+        if not self.total_offers:
+            return 0.0, 0.0, 0.0
+        rate = count / self.total_offers
+        if self.population is None:
+            return rate, rate, rate
+        low, high = wilson_interval(count, self.total_offers)
+        return rate, low, high
+
+    def rule_share(self, rule):
+        """Доля товаров, не прошедших условие пары (поле, условие)"""
+        # Каждое условие дает не больше одной ошибки на товар
+        return self.share(self.rule_counts.get(rule, 0))
+
+    def format_share(self, share):
+        rate, low, high = share
+        if self.population is None:
+            return f"{rate:.1%}"
+        return f"{rate:.1%} ({low:.1%}–{high:.1%})"
+
+    def example_lines(self, rule):
+        """Строки с примерами товаров для пары (поле, условие)"""
+        field_index, check_index = rule
+        field = self.plan.fields[field_index]
+        lines = []
+        for label, value in self.examples.get(rule, []):
+            message = field.message(check_index, value)
+            lines.append(f"  - {label}: {message if message is not None else 'не найдено'}")
+        return lines
+
+    def stats(self):
+        """Итоги и число ошибок по типам условий"""
+        stats = offer_stats(self)
+        if self.population is not None:
+            stats.append(f"Проверена случайная выборка из {self.population} товаров фида")
+            stats.append("Оценка доли товаров с ошибками (95% интервал): "
+                         f"{self.format_share(self.share(self.offers_with_errors))}")
+        if not self.offers_with_errors:
+            stats.append("\nВсе товары соответствуют заданным условиям!")
+            return stats
+
+        stats.append(f"Всего ошибок: {self.error_count}")
+        stats.append("\nОшибок по типам условий:")
+        kinds = sorted(self.kind_counts.items(), key=lambda item: -item[1])
+        stats.extend(f"  - {kind}: {count}" for kind, count in kinds)
+        return stats
+
+    def lines(self):
+        """Строки сводки по каждой паре (поле, условие) с примерами"""
+        if self.rule_counts:
+            yield "\nСводка ошибок по полям:"
+        for rule in self.rules():
+            field_name = self.plan.fields[rule[0]].name
+            yield (f"\nПоле '{field_name}', {self.condition(*rule)}: "
+                   f"{self.rule_counts[rule]} ({self.format_share(self.rule_share(rule))})")
+            yield from self.example_lines(rule)
+
+    def text(self):
+        return '\n'.join(chain(self.stats(), self.lines()))
+
+
+def offer_stats(report):
+    """Общие строки итогов для отчета и сводки"""
+    return [
+        "Результаты проверки:",
+        f"Всего проверено товаров: {report.total_offers}",
+        f"Товаров с ошибками: {report.offers_with_errors}",
+        f"Товаров без ошибок: {report.total_offers - report.offers_with_errors}",
+    ]
+
+
+def build_report(fields_conditions, results):
+    """Отчет по результатам validate_offers"""
+    report = Report(RulePlan(fields_conditions))
+    for label, offer_errors in results:
+        report.add(label, offer_errors)
+    return report
@@ -1,15 +1,25 @@
+import os
 import sys
 import json
-import xml.etree.ElementTree as ET
-from datetime import datetime
-from openpyxl import load_workbook
+import time
+from array import array
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QHBoxLayout, QLineEdit, QComboBox, QPushButton,
                            QScrollArea, QLabel, QSpinBox, QDoubleSpinBox,
                            QGridLayout, QFrame, QDateEdit, QMessageBox, QSplitter,
-                           QMenu, QFileDialog, QTextEdit)
-from PyQt5.QtCore import Qt, QDate
+                           QMenu, QFileDialog, QCheckBox, QTableView, QHeaderView)
+from PyQt5.QtCore import Qt, QDate, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QPalette, QColor
+from column_cache import DEFAULT_CACHE_DIR, ColumnCache
+from columnar_checks import COLUMNAR_AVAILABLE
+from feed_reader import iter_xml_values, iter_xlsx_values
+from feed_validator import (validate_offers, fields_conditions_from_config, Report, ErrorSummary,
+                            MISSING_CONDITION)
+from report_export import PARQUET_AVAILABLE, open_export
+from result_cache import DEFAULT_CACHE_PATH, validate_cached
+from revalidation import BYTES_LIMIT, FeedSnapshot
+from sampling import OfferSample
+from rule_plan import RulePlan, compile_condition
 
 class ConditionWidget(QFrame):
     def __init__(self, field_type, condition_type, parent=None):
@@ -180,6 +190,7 @@ class ConditionWidget(QFrame):
     <li><b>\\s</b> - пробел</li>
     <li><b>[]</b> - набор допустимых символов. Например: [ABC] - только A, B или C</li>
 </ul>
+<p>Остальные символы должны совпадать буквально, а значение должно целиком соответствовать маске.</p>
 <p><b>Примеры масок:</b></p>
 <ul>
     <li>Телефон: <code>+7 (\\d\\d\\d) \\d\\d\\d-\\d\\d-\\d\\d</code></li>
@@ -195,6 +206,9 @@ class ConditionWidget(QFrame):
         msg.exec_()
 
 class FieldWidget(QFrame):
+    # Нажата кнопка удаления поля
+    delete_requested = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
@@ -217,14 +231,23 @@ class FieldWidget(QFrame):
     def from_dict(cls, data, parent=None):
         """Создание виджета поля из словаря"""
         widget = cls(parent)
-        widget.field_name.setText(data['name'])
-        widget.field_type.setCurrentText(data['type'])
+        widget.set_data(data)
+        return widget
+
+    def set_data(self, data):
+        """Заполнение виджета данными поля вместо прежних"""
+        while self.conditions_layout.count():
+            condition = self.conditions_layout.takeAt(0).widget()
+            if condition is not None:
+                condition.hide()
+                condition.deleteLater()
+
+        self.field_name.setText(data['name'])
+        self.field_type.setCurrentText(data['type'])
         
         for condition_data in data['conditions']:
-            condition = ConditionWidget.from_dict(condition_data, widget)
-            widget.conditions_layout.addWidget(condition)
-        
-        return widget
+            condition = ConditionWidget.from_dict(condition_data, self)
+            self.conditions_layout.addWidget(condition)
 
     def init_ui(self):
         main_layout = QHBoxLayout()
@@ -233,7 +256,7 @@ class FieldWidget(QFrame):
         # Кнопка удаления поля
         delete_field_btn = QPushButton("×")
         delete_field_btn.setObjectName("controlButton")
-        delete_field_btn.clicked.connect(self.deleteLater)
+        delete_field_btn.clicked.connect(self.delete_requested)
         main_layout.addWidget(delete_field_btn)
         
         # Поле для имени
@@ -292,9 +315,453 @@ class FieldWidget(QFrame):
         condition = ConditionWidget(field_type, condition_type)
         self.conditions_layout.addWidget(condition)
 
+class FieldEditor(QScrollArea):
+    """Список полей конфигурации, в котором живые виджеты есть только у видимых строк.
+
+    Поля хранятся в self.fields как словари в формате FieldWidget.to_dict.
+    Виджетов FieldWidget создается столько, сколько строк помещается на
+    экране; при прокрутке строка, ушедшая за край, заполняется данными
+    следующего поля. Правки строки записываются в ее словарь, когда строка
+    переходит к другому полю или когда конфигурация читается целиком.
+    """
+    SPACING = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fields = []
+        # Виджеты строк; строка с номером поля i - rows[i % len(rows)]
+        self.rows = []
+        self.row_height = None
+        self.setWidgetResizable(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        # У контейнера нет layout: строки расставляются вручную
+        self.container = QWidget()
+        self.setWidget(self.container)
+        self.verticalScrollBar().valueChanged.connect(self.update_rows)
+
+    def set_fields(self, fields):
+        """Замена всех полей; строится только видимая часть списка"""
+        for row in self.rows:
+            row.field_index = None
+        self.fields = list(fields)
+        self.verticalScrollBar().setValue(0)
+        self.update_rows()
+
+    def check_fields(self, fields):
+        """Проверка, что каждое поле можно показать в строке редактора.
+
+        Строки заполняются только при прокрутке, поэтому ошибка в значениях
+        условий (например, дробная граница для QSpinBox) иначе проявилась бы
+        уже внутри обработки событий Qt. Все поля по очереди заполняют одну
+        невидимую строку; исключение выходит к вызывающему.
+        """
+        probe = FieldWidget()
+        try:
+            for field_data in fields:
+                probe.set_data(field_data)
+        finally:
+            probe.deleteLater()
+
+    def to_list(self):
+        """Все поля в порядке списка, с учетом несохраненных правок в строках"""
+        for row in self.rows:
+            self._commit(row)
+        return list(self.fields)
+
+    def add_field(self):
+        self.fields.append({'name': "", 'type': "text", 'conditions': []})
+        self.update_rows()
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def remove_field(self, row):
+        if row.field_index is None:
+            return
+        for other in self.rows:
+            self._commit(other)
+        del self.fields[row.field_index]
+        # Номера полей после удаленного сдвинулись, строки заполняются заново
+        for other in self.rows:
+            other.field_index = None
+        self.update_rows()
+
+    def _commit(self, row):
+        if row.field_index is not None:
+            self.fields[row.field_index] = row.to_dict()
+
+    def _new_row(self):
+        row = FieldWidget(self.container)
+        row.field_index = None
+        row.delete_requested.connect(lambda: self.remove_field(row))
+        return row
+
+    def _measure_row_height(self):
+        # Высота строки с самым высоким условием, с учетом стилей окна
+        probe = self._new_row()
+        probe.conditions_layout.addWidget(ConditionWidget("date", "Диапазон дат", probe))
+        probe.ensurePolished()
+        height = probe.sizeHint().height()
+        probe.deleteLater()
+        return height
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_rows()
+
+    def update_rows(self):
+        """Заполнение и расстановка строк для видимой части списка"""
+        if self.row_height is None:
+            self.row_height = self._measure_row_height()
+        step = self.row_height + self.SPACING
+        self.container.setMinimumHeight(len(self.fields) * step)
+
+        visible = self.viewport().height() // step + 2
+        if len(self.rows) < visible:
+            for row in self.rows:
+                self._commit(row)
+                row.field_index = None
+            while len(self.rows) < visible:
+                self.rows.append(self._new_row())
+
+        first = self.verticalScrollBar().value() // step
+        last = min(first + len(self.rows), len(self.fields))
+        width = self.viewport().width()
+        for field_index in range(first, last):
+            row = self.rows[field_index % len(self.rows)]
+            if row.field_index != field_index:
+                self._commit(row)
+                row.set_data(self.fields[field_index])
+                row.field_index = field_index
+            width = max(width, row.sizeHint().width())
+            row.setGeometry(0, field_index * step, width, self.row_height)
+            row.show()
+        for row in self.rows:
+            if row.field_index is not None and first <= row.field_index < last:
+                row.resize(width, self.row_height)
+            else:
+                self._commit(row)
+                row.field_index = None
+                row.hide()
+        self.container.setMinimumWidth(width)
+
+class ValidationWorker(QThread):
+    """Проверка товаров в фоновом потоке, чтобы не блокировать интерфейс"""
+    # Товаров проверено, товаров с ошибками, товаров в секунду
+    progress = pyqtSignal(int, int, float)
+    # Статистика в начало отчета; признак отмены
+    completed = pyqtSignal(str, bool)
+    failed = pyqtSignal(str)
+
+    # Как часто (в секундах) отправлять прогресс
+    UPDATE_INTERVAL = 0.25
+
+    def __init__(self, fields_conditions, offers, workers, columnar=False, export=None,
+                 summary=False, sample=None, filename=None, cache_path=None, snapshot=None,
+                 recheck=False, parent=None):
+        super().__init__(parent)
+        self.fields_conditions = fields_conditions
+        self.offers = offers
+        self.workers = workers
+        self.columnar = columnar
+        # Открытая выгрузка ошибок в файл или None
+        self.export = export
+        # OfferSample, если проверяется только случайная выборка товаров;
+        # offers тогда уже содержит только товары выборки
+        self.sample = sample
+        # Файл фида и кэш результатов прошлых проверок (cache_path=None - без кэша)
+        self.filename = filename
+        self.cache_path = cache_path
+        # FeedSnapshot: при полной проверке в него записываются значения товаров,
+        # при recheck фид не читается, а перепроверяются только изменившиеся поля
+        self.snapshot = snapshot
+        self.recheck = recheck
+        # Отчет (или только сводка) заполняется по ходу проверки,
+        # таблица отчета читает его напрямую. По выборке строится только сводка
+        report_class = ErrorSummary if summary or sample is not None else Report
+        self.report = report_class(RulePlan(fields_conditions))
+
+    def run(self):
+        offers = self.offers
+        if self.snapshot is not None and not self.recheck:
+            offers = self.snapshot.record(offers)
+        if self.sample is not None:
+            # Товары выборки отбирает чтение фида. Выборка готова только после
+            # чтения всего фида, отмена проверяется и во время чтения
+            self.sample.should_stop = self.isInterruptionRequested
+        if self.recheck:
+            results = self.snapshot.recheck(self.fields_conditions)
+        elif self.cache_path is not None and self.sample is None:
+            results = validate_cached(self.cache_path, self.fields_conditions, self.filename,
+                                      offers, self.workers, self.columnar)
+        else:
+            results = validate_offers(self.fields_conditions, offers, self.workers,
+                                      columnar=self.columnar)
+        started = last_update = time.monotonic()
+        cancelled = False
+        try:
+            for label, offer_errors in results:
+                if self.report.add(label, offer_errors) and self.export is not None:
+                    self.export.write(label, offer_errors)
+
+                now = time.monotonic()
+                if now - last_update >= self.UPDATE_INTERVAL:
+                    last_update = now
+                    self._emit_progress(now - started)
+                    if self.isInterruptionRequested():
+                        cancelled = True
+                        break
+
+            if self.sample is not None:
+                self.report.population = self.sample.seen
+                cancelled = cancelled or self.isInterruptionRequested()
+            self._emit_progress(time.monotonic() - started)
+            if self.snapshot is not None and not cancelled and isinstance(self.report, Report):
+                self.snapshot.finish(self.fields_conditions, self.report)
+            self.completed.emit('\n'.join(self.report.stats()), cancelled)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            results.close()
+            if self.export is not None:
+                try:
+                    self.export.close()
+                except Exception as e:
+                    self.failed.emit(f"не удалось записать выгрузку: {str(e)}")
+
+    def _emit_progress(self, elapsed):
+        # Выгрузку можно читать, не дожидаясь конца проверки
+        if self.export is not None:
+            self.export.flush()
+        report = self.report
+        rate = report.total_offers / elapsed if elapsed > 0 else 0.0
+        self.progress.emit(report.total_offers, report.offers_with_errors, rate)
+
+class ReportModel(QAbstractTableModel):
+    """Таблица ошибок поверх Report.
+
+    Текст ячеек строится только для строк, которые видны на экране. Фильтр и
+    сортировка хранятся как массив номеров ошибок, сам отчет не меняется.
+    """
+    HEADERS = ["Товар", "Поле", "Условие", "Ошибка"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.report = None
+        self.error_count = 0
+        # Номера показываемых ошибок по порядку; None - все ошибки отчета
+        self.rows = None
+        self.field_filter = None
+        self.condition_filter = None
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    def set_report(self, report):
+        self.beginResetModel()
+        self.report = report
+        self.error_count = len(report) if report is not None else 0
+        self.rows = None
+        self.field_filter = None
+        self.condition_filter = None
+        self.sort_column = -1
+        self.endResetModel()
+
+    def refresh(self):
+        """Добавляет в таблицу ошибки, появившиеся в отчете с прошлого раза"""
+        if self.report is None:
+            return
+        count = len(self.report)
+        if count == self.error_count:
+            return
+        if self.rows is None:
+            self.beginInsertRows(QModelIndex(), self.error_count, count - 1)
+            self.error_count = count
+            self.endInsertRows()
+        else:
+            self.beginResetModel()
+            self.error_count = count
+            self.rows = self._select_rows()
+            self.endResetModel()
+
+    def condition_names(self):
+        """Все условия плана, по которым можно отфильтровать таблицу"""
+        names = [MISSING_CONDITION]
+        if self.report is not None:
+            for field in self.report.plan:
+                for check_type in field.check_types:
+                    if check_type not in names:
+                        names.append(check_type)
+        return names
+
+    def set_filter(self, field_index, condition):
+        """Отбор ошибок по номеру поля и типу условия (None - без отбора)"""
+        self.beginResetModel()
+        self.field_filter = field_index
+        self.condition_filter = condition
+        self.rows = self._select_rows()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.sort_order = order
+        self.rows = self._select_rows()
+        self.layoutChanged.emit()
+
+    def _condition_name(self, error_index):
+        condition = self.report.condition(error_index)
+        return condition if condition is not None else MISSING_CONDITION
+
+    def _message(self, error_index):
+        message = self.report.message(error_index)
+        return message if message is not None else "не найдено"
+
+    def _select_rows(self):
+        if (self.report is None or self.field_filter is None and self.condition_filter is None
+                and self.sort_column < 0):
+            return None
+
+        report = self.report
+        rows = range(self.error_count)
+        if self.field_filter is not None:
+            fields = report.error_fields
+            rows = [i for i in rows if fields[i] == self.field_filter]
+        if self.condition_filter is not None:
+            rows = [i for i in rows if self._condition_name(i) == self.condition_filter]
+
+        # Сортировка устойчивая: внутри равных значений сохраняется порядок фида
+        keys = {
+            0: report.error_offer,
+            1: lambda i: report.field(i).name,
+            2: self._condition_name,
+            3: self._message,
+        }
+        key = keys.get(self.sort_column)
+        if self.sort_column == 0 and self.sort_order == Qt.AscendingOrder:
+            # Ошибки и так идут в порядке товаров фида
+            key = None
+        if key is not None:
+            rows = sorted(rows, key=key, reverse=self.sort_order == Qt.DescendingOrder)
+        return array('q', rows)
+
+    def error_index(self, row):
+        return self.rows[row] if self.rows is not None else row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self.rows is not None else self.error_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        error_index = self.error_index(index.row())
+        column = index.column()
+        if column == 0:
+            return self.report.offer_labels[self.report.error_offer(error_index)]
+        if column == 1:
+            return self.report.field(error_index).name
+        if column == 2:
+            return self._condition_name(error_index)
+        return self._message(error_index)
+
+class SummaryModel(QAbstractTableModel):
+    """Таблица сводки: строка на пару (поле, условие) с числом ошибок и примерами"""
+    HEADERS = ["Поле", "Условие", "Ошибок", "Доля товаров", "Примеры"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summary = None
+        self.rules = []
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    def set_summary(self, summary):
+        self.beginResetModel()
+        self.summary = summary
+        self.rules = summary.rules() if summary is not None else []
+        self.sort_column = -1
+        self.endResetModel()
+
+    def refresh(self):
+        """Обновляет счетчики; новые пары (поле, условие) добавляются в таблицу"""
+        if self.summary is None:
+            return
+        if len(self.summary.rule_counts) != len(self.rules):
+            self.beginResetModel()
+            self.rules = self.summary.rules()
+            self._sort_rules()
+            self.endResetModel()
+        elif self.rules:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self.rules) - 1, len(self.HEADERS) - 1))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.sort_order = order
+        self._sort_rules()
+        self.layoutChanged.emit()
+
+    def _sort_rules(self):
+        if self.sort_column < 0 or self.summary is None:
+            return
+        self.rules.sort(key=lambda rule: self._sort_key(rule, self.sort_column),
+                        reverse=self.sort_order == Qt.DescendingOrder)
+
+    def _sort_key(self, rule, column):
+        if column == 0:
+            return self.summary.plan.fields[rule[0]].name
+        if column == 1:
+            return self.summary.condition(*rule)
+        if column == 2:
+            return self.summary.rule_counts[rule]
+        if column == 3:
+            return self.summary.rule_share(rule)
+        return rule
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rules)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rule = self.rules[index.row()]
+        column = index.column()
+        if role == Qt.ToolTipRole and column == 4:
+            return '\n'.join(line.strip() for line in self.summary.example_lines(rule))
+        if role != Qt.DisplayRole:
+            return None
+        if column == 0:
+            return self.summary.plan.fields[rule[0]].name
+        if column == 1:
+            return self.summary.condition(*rule)
+        if column == 2:
+            return self.summary.rule_counts[rule]
+        if column == 3:
+            return self.summary.format_share(self.summary.rule_share(rule))
+        return ", ".join(label for label, _ in self.summary.examples.get(rule, []))
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.validation_worker = None
+        # Значения товаров последнего проверенного фида для быстрой перепроверки
+        self.feed_snapshot = None
         self.init_ui()
 
     def init_ui(self):
@@ -325,18 +792,101 @@ class MainWindow(QMainWindow):
         toolbar.addWidget(load_btn)
 
         # Кнопка проверки XML
-        validate_xml_btn = QPushButton("Проверить XML")
-        validate_xml_btn.clicked.connect(self.validate_xml)
-        validate_xml_btn.setFixedWidth(150)
-        toolbar.addWidget(validate_xml_btn)
+        self.validate_xml_btn = QPushButton("Проверить XML")
+        self.validate_xml_btn.clicked.connect(self.validate_xml)
+        self.validate_xml_btn.setFixedWidth(150)
+        toolbar.addWidget(self.validate_xml_btn)
 
         # Кнопка проверки XLSX
-        validate_xlsx_btn = QPushButton("Проверить XLSX")
-        validate_xlsx_btn.clicked.connect(self.validate_xlsx)
-        validate_xlsx_btn.setFixedWidth(150)
-        toolbar.addWidget(validate_xlsx_btn)
+        self.validate_xlsx_btn = QPushButton("Проверить XLSX")
+        self.validate_xlsx_btn.clicked.connect(self.validate_xlsx)
+        self.validate_xlsx_btn.setFixedWidth(150)
+        toolbar.addWidget(self.validate_xlsx_btn)
+
+        # Число процессов для параллельной проверки
+        toolbar.addWidget(QLabel("Процессов:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setToolTip("Сколько ядер использовать для проверки товаров")
+        toolbar.addWidget(self.workers_spin)
+
+        # Векторная проверка по столбцам (нужны numpy и pandas)
+        self.columnar_check = QCheckBox("По столбцам")
+        self.columnar_check.setToolTip("Проверять условия векторно по столбцам пачки товаров")
+        if not COLUMNAR_AVAILABLE:
+            self.columnar_check.setEnabled(False)
+            self.columnar_check.setToolTip("Для проверки по столбцам установите numpy 2 и pandas")
+        toolbar.addWidget(self.columnar_check)
+
+        # Сводный режим: только счетчики по условиям и несколько примеров
+        self.summary_check = QCheckBox("Только сводка")
+        self.summary_check.setToolTip(
+            f"Считать ошибки по полям и условиям и хранить не больше "
+            f"{ErrorSummary.EXAMPLES_LIMIT} примеров товаров на условие"
+        )
+        toolbar.addWidget(self.summary_check)
+
+        # Повторное использование результатов прошлых проверок
+        self.cache_check = QCheckBox("Кэш")
+        self.cache_check.setToolTip(
+            "Проверять только изменившиеся товары, остальные результаты брать "
+            f"из кэша прошлых проверок ({DEFAULT_CACHE_PATH}); значения полей "
+            f"разобранных фидов хранить в {DEFAULT_CACHE_DIR}, чтобы не разбирать их повторно"
+        )
+        toolbar.addWidget(self.cache_check)
+
+        # Снимок значений фида для быстрой перепроверки после правки условий
+        self.recheck_check = QCheckBox("Перепроверка")
+        self.recheck_check.setToolTip(
+            "Запоминать значения полей проверенного фида (не больше "
+            f"{BYTES_LIMIT // 2 ** 20} МБ), чтобы после правки условий заново "
+            "проверять только изменившиеся поля, не читая файл"
+        )
+        self.recheck_check.toggled.connect(self.on_recheck_toggled)
+        toolbar.addWidget(self.recheck_check)
+
+        # Быстрая оценка по случайной выборке товаров (0 - проверять все)
+        toolbar.addWidget(QLabel("Выборка:"))
+        self.sample_spin = QSpinBox()
+        self.sample_spin.setSpecialValueText("все")
+        self.sample_spin.setToolTip(
+            "Проверить только случайную выборку и оценить доли ошибок. Разбираются "
+            "только товары выборки, но файл читается целиком, поэтому проверка "
+            "выборки не бывает быстрее чтения файла"
+        )
+        toolbar.addWidget(self.sample_spin)
+        self.sample_unit_combo = QComboBox()
+        self.sample_unit_combo.addItems(["товаров", "%"])
+        self.sample_unit_combo.currentIndexChanged.connect(self.update_sample_range)
+        toolbar.addWidget(self.sample_unit_combo)
+        self.update_sample_range()
+
+        # Формат потоковой выгрузки ошибок в файл
+        toolbar.addWidget(QLabel("Выгрузка:"))
+        self.export_combo = QComboBox()
+        self.export_combo.addItem("Нет", None)
+        self.export_combo.addItem("CSV", 'csv')
+        self.export_combo.addItem("JSON Lines", 'jsonl')
+        if PARQUET_AVAILABLE:
+            self.export_combo.addItem("Parquet", 'parquet')
+        self.export_combo.setToolTip("Записывать ошибки в файл по ходу проверки")
+        toolbar.addWidget(self.export_combo)
 
         toolbar.addStretch()
+
+        # Ход проверки и кнопка отмены
+        progress_bar = QHBoxLayout()
+        main_layout.addLayout(progress_bar)
+
+        self.progress_label = QLabel("")
+        progress_bar.addWidget(self.progress_label)
+        progress_bar.addStretch()
+
+        self.cancel_btn = QPushButton("Отменить")
+        self.cancel_btn.clicked.connect(self.cancel_validation)
+        self.cancel_btn.setFixedWidth(150)
+        self.cancel_btn.setEnabled(False)
+        progress_bar.addWidget(self.cancel_btn)
         
         # Создаем разделитель для основной области и отчета
         splitter = QSplitter(Qt.Vertical)
@@ -347,34 +897,59 @@ class MainWindow(QMainWindow):
         top_layout = QVBoxLayout()
         top_widget.setLayout(top_layout)
         
-        # Создаем область прокрутки для полей
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        top_layout.addWidget(scroll_area)
-        
-        # Контейнер для полей
-        self.fields_container = QWidget()
-        self.fields_layout = QVBoxLayout()
-        self.fields_layout.setAlignment(Qt.AlignTop)
-        self.fields_layout.setSpacing(10)
-        self.fields_container.setLayout(self.fields_layout)
+        # Область прокрутки с полями: виджеты создаются только для видимых строк
+        self.field_editor = FieldEditor()
+        top_layout.addWidget(self.field_editor)
         
         # Кнопка добавления нового поля
         add_field_btn = QPushButton("Добавить поле")
         add_field_btn.setFixedWidth(200)
         add_field_btn.clicked.connect(self.add_field)
-        self.fields_layout.addWidget(add_field_btn, alignment=Qt.AlignLeft)
-        
-        scroll_area.setWidget(self.fields_container)
+        top_layout.addWidget(add_field_btn, alignment=Qt.AlignLeft)
         
         splitter.addWidget(top_widget)
         
-        # Нижняя часть с отчетом
-        self.report_text = QTextEdit()
-        self.report_text.setReadOnly(True)
-        self.report_text.setMinimumHeight(200)
-        splitter.addWidget(self.report_text)
+        # Нижняя часть с отчетом: итоги, фильтры и таблица ошибок
+        report_widget = QWidget()
+        report_layout = QVBoxLayout()
+        report_layout.setContentsMargins(0, 0, 0, 0)
+        report_widget.setLayout(report_layout)
+
+        self.report_stats = QLabel("")
+        self.report_stats.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        report_layout.addWidget(self.report_stats)
+
+        filter_bar = QHBoxLayout()
+        report_layout.addLayout(filter_bar)
+        filter_bar.addWidget(QLabel("Поле:"))
+        self.field_filter_combo = QComboBox()
+        self.field_filter_combo.currentIndexChanged.connect(self.apply_report_filter)
+        filter_bar.addWidget(self.field_filter_combo)
+        filter_bar.addWidget(QLabel("Условие:"))
+        self.condition_filter_combo = QComboBox()
+        self.condition_filter_combo.currentIndexChanged.connect(self.apply_report_filter)
+        filter_bar.addWidget(self.condition_filter_combo)
+        filter_bar.addStretch()
+
+        # Таблица рисует только видимые строки, поэтому отчет любого
+        # размера открывается сразу
+        self.report_model = ReportModel(self)
+        self.summary_model = SummaryModel(self)
+        self.report_view = QTableView()
+        self.report_view.setModel(self.report_model)
+        self.report_view.setMinimumHeight(200)
+        self.report_view.setWordWrap(False)
+        self.report_view.setSelectionBehavior(QTableView.SelectRows)
+        self.report_view.verticalHeader().hide()
+        # Одинаковая высота строк: таблице не нужно измерять каждую строку
+        self.report_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.report_view.horizontalHeader().setStretchLastSection(True)
+        self.report_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.report_view.setSortingEnabled(True)
+        report_layout.addWidget(self.report_view)
+
+        splitter.addWidget(report_widget)
+        self.reset_report_filters()
         
         # Устанавливаем соотношение размеров частей сплиттера
         splitter.setSizes([600, 200])
@@ -383,18 +958,8 @@ class MainWindow(QMainWindow):
         self.apply_styles()
 
     def add_field(self):
-        # Удаляем кнопку добавления
-        add_button = self.fields_layout.itemAt(self.fields_layout.count() - 1).widget()
-        self.fields_layout.removeWidget(add_button)
-        
-        # Создаем новое поле
-        field = FieldWidget()
-        self.fields_layout.addWidget(field)
-        
-        # Возвращаем кнопку в конец
-        self.fields_layout.addWidget(add_button, alignment=Qt.AlignLeft)
-        
-        return field
+        # Новое поле добавляется в конец списка и прокручивается в вид
+        self.field_editor.add_field()
 
     def apply_styles(self):
         # Устанавливаем теплую цветовую схему
@@ -550,12 +1115,7 @@ class MainWindow(QMainWindow):
         )
         
         if filename:
-            data = []
-            # Пропускаем последний элемент (кнопку добавления)
-            for i in range(self.fields_layout.count() - 1):
-                widget = self.fields_layout.itemAt(i).widget()
-                if isinstance(widget, FieldWidget):
-                    data.append(widget.to_dict())
+            data = self.field_editor.to_list()
             
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
@@ -578,315 +1138,252 @@ class MainWindow(QMainWindow):
                 with open(filename, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 
-                # Очищаем текущие поля
-                while self.fields_layout.count() > 1:  # Оставляем кнопку добавления
-                    widget = self.fields_layout.itemAt(0).widget()
-                    self.fields_layout.removeWidget(widget)
-                    widget.deleteLater()
-                
-                # Загружаем поля из файла
-                for field_data in data:
-                    field = FieldWidget.from_dict(field_data, self.fields_container)
-                    # Вставляем поле перед кнопкой добавления
-                    self.fields_layout.insertWidget(self.fields_layout.count() - 1, field)
+                # Виджеты строятся только для видимых полей, поэтому формат
+                # и значения условий всех полей проверяем заранее
+                fields_conditions_from_config(data)
+                self.field_editor.check_fields(data)
+                self.field_editor.set_fields(data)
                 
                 QMessageBox.information(self, "Успех", "Конфигурация успешно загружена")
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить файл: {str(e)}")
 
+    def collect_fields_conditions(self):
+        """Сбор всех полей и их условий из редактора"""
+        return fields_conditions_from_config(self.field_editor.to_list())
+
     def validate_xml(self):
         """Проверка XML файла на соответствие условиям"""
         filename, _ = QFileDialog.getOpenFileName(
             self,
             "Выберите XML файл",
-            "",
+            self.last_feed_filename(),
             "XML файлы (*.xml);;Все файлы (*.*)"
         )
         
         if not filename:
             return
             
-        try:
-            # Парсим XML файл
-            tree = ET.parse(filename)
-            root = tree.getroot()
-            
-            # Ищем тег offers
-            offers_tag = root.find('.//offers')
-            if offers_tag is None:
-                raise ValueError("Тег <offers> не найден в файле")
-            
-            # Собираем все поля и их условия
-            fields_conditions = {}
-            for i in range(self.fields_layout.count() - 1):  # Исключаем кнопку добавления
-                field_widget = self.fields_layout.itemAt(i).widget()
-                if isinstance(field_widget, FieldWidget):
-                    field_name = field_widget.field_name.text()
-                    field_type = field_widget.field_type.currentText()
-                    conditions = []
-                    
-                    for j in range(field_widget.conditions_layout.count()):
-                        condition_widget = field_widget.conditions_layout.itemAt(j).widget()
-                        if isinstance(condition_widget, ConditionWidget):
-                            conditions.append({
-                                'type': condition_widget.condition_type,
-                                'field_type': field_type,
-                                'values': condition_widget.to_dict()['values']
-                            })
-                    
-                    fields_conditions[field_name] = {
-                        'type': field_type,
-                        'conditions': conditions
-                    }
-            
-            # Проверяем каждый offer
-            report = []
-            total_offers = 0
-            offers_with_errors = 0
-            
-            for offer in offers_tag.findall('offer'):
-                total_offers += 1
-                offer_id = offer.get('id', 'Неизвестный ID')
-                offer_errors = []
-                
-                # Проверяем каждое поле
-                for field_name, field_info in fields_conditions.items():
-                    # Ищем значение поля
-                    field_value = None
-                    
-                    # Сначала ищем как обычный тег
-                    field_elem = offer.find(field_name)
-                    if field_elem is not None:
-                        field_value = field_elem.text
-                    else:
-                        # Если не нашли, ищем в param с атрибутом name
-                        for param in offer.findall('param'):
-                            if param.get('name') == field_name:
-                                field_value = param.text
-                                break
-                    
-                    if field_value is None:
-                        offer_errors.append(f"  - Поле '{field_name}' не найдено")
-                        continue
-                    
-                    # Проверяем каждое условие для поля
-                    for condition in field_info['conditions']:
-                        error = self.check_condition(field_value, condition, field_info['type'])
-                        if error:
-                            offer_errors.append(f"  - Поле '{field_name}': {error}")
-                
-                # Добавляем в отчет только если есть ошибки
-                if offer_errors:
-                    offers_with_errors += 1
-                    report.append(f"\nТовар (ID: {offer_id}):")
-                    report.extend(offer_errors)
-            
-            # Добавляем статистику в начало отчета
-            stats = [
-                "Результаты проверки:",
-                f"Всего проверено товаров: {total_offers}",
-                f"Товаров с ошибками: {offers_with_errors}",
-                f"Товаров без ошибок: {total_offers - offers_with_errors}",
-                "\nПодробный отчет об ошибках:"
-            ]
-            
-            # Если нет ошибок, добавляем сообщение об этом
-            if not report:
-                stats.append("\nВсе товары соответствуют заданным условиям!")
-            
-            # Выводим отчет
-            self.report_text.setText('\n'.join(stats + report))
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при проверке файла: {str(e)}")
+        fields_conditions = self.collect_fields_conditions()
+        
+        # Товары читаются потоково, по одному <offer> за раз
+        self.start_validation(fields_conditions, iter_xml_values, filename)
 
     def validate_xlsx(self):
         """Проверка XLSX файла на соответствие условиям"""
         filename, _ = QFileDialog.getOpenFileName(
             self,
             "Выберите XLSX файл",
-            "",
+            self.last_feed_filename(),
             "Excel файлы (*.xlsx);;Все файлы (*.*)"
         )
         
         if not filename:
             return
             
-        try:
-            # Загружаем XLSX файл
-            wb = load_workbook(filename, read_only=True, data_only=True)
-            sheet = wb.active
-            
-            # Получаем заголовки (названия полей)
-            headers = [str(cell.value) if cell.value is not None else "" for cell in next(sheet.rows)]
-            
-            # Собираем все поля и их условия
-            fields_conditions = {}
-            for i in range(self.fields_layout.count() - 1):  # Исключаем кнопку добавления
-                field_widget = self.fields_layout.itemAt(i).widget()
-                if isinstance(field_widget, FieldWidget):
-                    field_name = field_widget.field_name.text()
-                    field_type = field_widget.field_type.currentText()
-                    conditions = []
-                    
-                    for j in range(field_widget.conditions_layout.count()):
-                        condition_widget = field_widget.conditions_layout.itemAt(j).widget()
-                        if isinstance(condition_widget, ConditionWidget):
-                            conditions.append({
-                                'type': condition_widget.condition_type,
-                                'field_type': field_type,
-                                'values': condition_widget.to_dict()['values']
-                            })
-                    
-                    fields_conditions[field_name] = {
-                        'type': field_type,
-                        'conditions': conditions
-                    }
-            
-            # Проверяем каждую строку (товар)
-            report = []
-            total_offers = 0
-            offers_with_errors = 0
-            
-            # Пропускаем первую строку с заголовками
-            rows = list(sheet.rows)[1:]
-            
-            for row_idx, row in enumerate(rows, start=2):  # start=2 так как первая строка - заголовки
-                total_offers += 1
-                offer_errors = []
-                
-                # Создаем словарь значений полей для текущей строки
-                row_data = {}
-                for col_idx, cell in enumerate(row):
-                    if col_idx < len(headers):
-                        row_data[headers[col_idx]] = str(cell.value) if cell.value is not None else ""
-                
-                # Проверяем каждое поле
-                for field_name, field_info in fields_conditions.items():
-                    # Получаем значение поля
-                    field_value = row_data.get(field_name)
-                    
-                    if field_value is None:
-                        offer_errors.append(f"  - Поле '{field_name}' не найдено")
-                        continue
-                    
-                    # Проверяем каждое условие для поля
-                    for condition in field_info['conditions']:
-                        error = self.check_condition(field_value, condition, field_info['type'])
-                        if error:
-                            offer_errors.append(f"  - Поле '{field_name}': {error}")
-                
-                # Добавляем в отчет только если есть ошибки
-                if offer_errors:
-                    offers_with_errors += 1
-                    report.append(f"\nТовар (строка {row_idx}):")
-                    report.extend(offer_errors)
-            
-            # Добавляем статистику в начало отчета
-            stats = [
-                "Результаты проверки:",
-                f"Всего проверено товаров: {total_offers}",
-                f"Товаров с ошибками: {offers_with_errors}",
-                f"Товаров без ошибок: {total_offers - offers_with_errors}",
-                "\nПодробный отчет об ошибках:"
-            ]
-            
-            # Если нет ошибок, добавляем сообщение об этом
-            if not report:
-                stats.append("\nВсе товары соответствуют заданным условиям!")
-            
-            # Выводим отчет
-            self.report_text.setText('\n'.join(stats + report))
-            
-            # Закрываем файл
-            wb.close()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при проверке файла: {str(e)}")
+        fields_conditions = self.collect_fields_conditions()
+        
+        # Каждая строка после заголовков - отдельный товар
+        self.start_validation(fields_conditions, iter_xlsx_values, filename)
+
+    def feed_values(self, filename, field_names, read_values):
+        """Чтение фида; с включенным кэшем значения полей берутся из кэша столбцов"""
+        if self.cache_check.isChecked():
+            return ColumnCache(DEFAULT_CACHE_DIR).iter_values(filename, field_names, read_values)
+        return read_values(filename, field_names)
+
+    def last_feed_filename(self):
+        """Последний проверенный фид, чтобы повторная проверка была в один клик"""
+        if self.feed_snapshot is None:
+            return ""
+        return self.feed_snapshot.signature[0]
+
+    def start_validation(self, fields_conditions, read_values, filename):
+        """Запуск проверки фида в фоновом потоке; read_values - iter_xml_values
+        или iter_xlsx_values"""
+        if self.validation_worker is not None:
+            return
+
+        export = None
+        export_format = self.export_combo.currentData()
+        if export_format is not None:
+            export_filename, _ = QFileDialog.getSaveFileName(
+                self,
+                "Файл для выгрузки ошибок",
+                "",
+                f"{self.export_combo.currentText()} (*.{export_format});;Все файлы (*.*)"
+            )
+            if not export_filename:
+                return
+            try:
+                # У выгрузки свой план: таблица отчета строит сообщения в другом потоке
+                export = open_export(export_filename, RulePlan(fields_conditions), export_format)
+            except Exception as e:
+                QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл выгрузки: {str(e)}")
+                return
+        
+        sample = self.offer_sample()
+        summary = self.summary_check.isChecked() or sample is not None
+        cache_path = DEFAULT_CACHE_PATH if self.cache_check.isChecked() else None
+        # Тот же файл после правки условий проверяется по сохраненным значениям
+        snapshot = self.feed_snapshot
+        recheck = (sample is None and snapshot is not None
+                   and snapshot.can_recheck(filename, fields_conditions))
+        keep_snapshot = self.recheck_check.isChecked() and not summary
+        if sample is not None:
+            # Выборка берется до разбора товаров, без кэша значений
+            offers = read_values(filename, list(fields_conditions), sample=sample)
+        else:
+            offers = self.feed_values(filename, list(fields_conditions), read_values)
+        if not recheck:
+            self.feed_snapshot = None
+            try:
+                snapshot = FeedSnapshot(filename, list(fields_conditions)) if keep_snapshot else None
+            except OSError:
+                snapshot = None
+        worker = ValidationWorker(fields_conditions, offers, self.workers_spin.value(),
+                                  self.columnar_check.isChecked(), export, summary, sample,
+                                  filename, cache_path, snapshot, recheck, self)
+        self.report_stats.setText("")
+        self.report_model.set_report(None if summary else worker.report)
+        self.summary_model.set_summary(worker.report if summary else None)
+        self.report_view.setModel(self.summary_model if summary else self.report_model)
+        self.report_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.reset_report_filters()
+        if recheck:
+            self.progress_label.setText("Перепроверка изменившихся полей...")
+        elif sample is not None:
+            self.progress_label.setText("Чтение выборки...")
+        else:
+            self.progress_label.setText("Проверка...")
+        self.set_validation_running(True)
+        
+        worker.progress.connect(self.on_validation_progress)
+        worker.completed.connect(self.on_validation_completed)
+        worker.failed.connect(self.on_validation_failed)
+        worker.finished.connect(self.on_worker_finished)
+        self.validation_worker = worker
+        worker.start()
+
+    def on_recheck_toggled(self, checked):
+        if not checked:
+            # Снимок больше не нужен, память освобождается сразу
+            self.feed_snapshot = None
+
+    def update_sample_range(self):
+        if self.sample_unit_combo.currentIndex() == 0:
+            self.sample_spin.setRange(0, 10000000)
+            self.sample_spin.setSingleStep(1000)
+        else:
+            self.sample_spin.setRange(0, 100)
+            self.sample_spin.setSingleStep(1)
+
+    def offer_sample(self):
+        """Выборка по настройкам панели; None - проверять все товары"""
+        value = self.sample_spin.value()
+        if not value:
+            return None
+        if self.sample_unit_combo.currentIndex() == 0:
+            return OfferSample(size=value)
+        return OfferSample(fraction=value / 100)
+
+    def cancel_validation(self):
+        """Остановка текущей проверки"""
+        if self.validation_worker is not None:
+            self.validation_worker.requestInterruption()
+            self.cancel_btn.setEnabled(False)
+            self.progress_label.setText("Отмена...")
+
+    def set_validation_running(self, running):
+        self.validate_xml_btn.setEnabled(not running)
+        self.validate_xlsx_btn.setEnabled(not running)
+        self.workers_spin.setEnabled(not running)
+        self.columnar_check.setEnabled(not running and COLUMNAR_AVAILABLE)
+        self.export_combo.setEnabled(not running)
+        self.summary_check.setEnabled(not running)
+        self.cache_check.setEnabled(not running)
+        self.recheck_check.setEnabled(not running)
+        self.sample_spin.setEnabled(not running)
+        self.sample_unit_combo.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        # Пока отчет растет, ошибки показываются в порядке фида;
+        # у сводки фильтров нет
+        filters_enabled = not running and self.report_view.model() is self.report_model
+        self.field_filter_combo.setEnabled(filters_enabled)
+        self.condition_filter_combo.setEnabled(filters_enabled)
+        self.report_view.setSortingEnabled(not running)
+
+    def reset_report_filters(self):
+        """Списки фильтров по полям и условиям текущего отчета"""
+        report = self.report_model.report
+        for combo in (self.field_filter_combo, self.condition_filter_combo):
+            combo.blockSignals(True)
+            combo.clear()
+        self.field_filter_combo.addItem("Все поля")
+        if report is not None:
+            for field in report.plan:
+                self.field_filter_combo.addItem(field.name)
+        self.condition_filter_combo.addItem("Все условия")
+        self.condition_filter_combo.addItems(self.report_model.condition_names())
+        for combo in (self.field_filter_combo, self.condition_filter_combo):
+            combo.blockSignals(False)
+
+    def apply_report_filter(self):
+        field_index = self.field_filter_combo.currentIndex() - 1
+        condition_index = self.condition_filter_combo.currentIndex()
+        self.report_model.set_filter(
+            field_index if field_index >= 0 else None,
+            self.condition_filter_combo.currentText() if condition_index > 0 else None
+        )
+
+    def on_validation_progress(self, total_offers, offers_with_errors, rate):
+        self.progress_label.setText(
+            f"Проверено товаров: {total_offers}, с ошибками: {offers_with_errors}, "
+            f"{rate:.0f} товаров/с"
+        )
+        self.report_model.refresh()
+        self.summary_model.refresh()
+
+    def on_validation_completed(self, stats, cancelled):
+        # Статистика известна только в конце, показываем ее над таблицей
+        self.report_model.refresh()
+        self.summary_model.refresh()
+        self.report_stats.setText(stats.strip())
+        if cancelled:
+            self.progress_label.setText("Проверка отменена, показаны проверенные товары")
+        else:
+            self.progress_label.setText(self.progress_label.text() + " - готово")
+
+    def on_validation_failed(self, message):
+        self.feed_snapshot = None
+        self.validation_worker.snapshot = None
+        self.report_model.set_report(None)
+        self.summary_model.set_summary(None)
+        self.reset_report_filters()
+        self.progress_label.setText("")
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при проверке файла: {message}")
+
+    def on_worker_finished(self):
+        snapshot = self.validation_worker.snapshot
+        if snapshot is not None and snapshot.ready:
+            self.feed_snapshot = snapshot
+        self.validation_worker.deleteLater()
+        self.validation_worker = None
+        self.set_validation_running(False)
+
+    def closeEvent(self, event):
+        # Не закрываем окно, пока фоновая проверка не остановится
+        if self.validation_worker is not None:
+            self.validation_worker.requestInterruption()
+            self.validation_worker.wait()
+        super().closeEvent(event)
 
     def check_condition(self, value, condition, field_type):
         """Проверка значения на соответствие условию"""
-        try:
-            if condition['type'] == "Длина":
-                if len(str(value)) < condition['values']['min']:
-                    return f"длина меньше минимальной ({len(str(value))} < {condition['values']['min']})"
-                if len(str(value)) > condition['values']['max']:
-                    return f"длина больше максимальной ({len(str(value))} > {condition['values']['max']})"
-                
-            elif condition['type'] == "Маска":
-                import re
-                pattern = condition['values']['pattern']
-                if not re.match(pattern, str(value)):
-                    return f"не соответствует маске '{pattern}'"
-                
-            elif condition['type'] == "Диапазон":
-                if field_type == "number":
-                    try:
-                        num_value = int(float(str(value).replace(',', '.')))
-                        min_val = int(condition['values']['min'])
-                        max_val = int(condition['values']['max'])
-                        if num_value < min_val:
-                            return f"значение меньше минимального ({num_value} < {min_val})"
-                        if num_value > max_val:
-                            return f"значение больше максимального ({num_value} > {max_val})"
-                    except ValueError:
-                        return f"значение '{value}' не является целым числом"
-                        
-                elif field_type in ["float", "money"]:
-                    try:
-                        num_value = float(str(value).replace(',', '.'))
-                        min_val = float(condition['values']['min'])
-                        max_val = float(condition['values']['max'])
-                        if num_value < min_val:
-                            return f"значение меньше минимального ({num_value} < {min_val})"
-                        if num_value > max_val:
-                            return f"значение больше максимального ({num_value} > {max_val})"
-                    except ValueError:
-                        return f"значение '{value}' не является числом"
-                        
-            elif condition['type'] == "Диапазон дат":
-                try:
-                    # Пробуем разные форматы дат
-                    date_formats = [
-                        "%Y-%m-%d",
-                        "%d.%m.%Y",
-                        "%Y-%m-%dT%H:%M:%S",
-                        "%Y-%m-%d %H:%M:%S"
-                    ]
-                    
-                    date_value = None
-                    for date_format in date_formats:
-                        try:
-                            date_value = datetime.strptime(str(value), date_format).date()
-                            break
-                        except ValueError:
-                            continue
-                            
-                    if date_value is None:
-                        return f"неверный формат даты '{value}'"
-                    
-                    min_date = datetime.strptime(condition['values']['min'], "%Y-%m-%d").date()
-                    max_date = datetime.strptime(condition['values']['max'], "%Y-%m-%d").date()
-                    
-                    if date_value < min_date:
-                        return f"дата раньше минимальной ({date_value} < {min_date})"
-                    if date_value > max_date:
-                        return f"дата позже максимальной ({date_value} > {max_date})"
-                except ValueError as e:
-                    return f"ошибка проверки даты: {str(e)}"
-                    
-            elif condition['type'] == "Точность":
-                if field_type in ["float", "money"]:
-                    value_str = str(value).replace(',', '.')
-                    if '.' in value_str:
-                        decimal_places = len(value_str.split('.')[-1])
-                        if decimal_places > condition['values']['precision']:
-                            return f"слишком много знаков после запятой ({decimal_places} > {condition['values']['precision']})"
-                        
-        except Exception as e:
-            return f"ошибка проверки значения: {str(e)}"
-            
-        return None
+        check = compile_condition(condition, field_type)
+        if check is None:
+            return None
+        return check(value)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,128 @@
+"""Потоковая выгрузка ошибок проверки в CSV, JSON Lines или Parquet.
+
+Каждая ошибка - одна запись (товар, поле, условие, значение, сообщение).
+Записи пишутся на диск по мере проверки и в памяти не накапливаются.
+"""
+import csv
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from rule_plan import MISSING
+
+PARQUET_AVAILABLE = pq is not None
+
+EXPORT_COLUMNS = ['offer', 'field', 'condition', 'value', 'message']
+
+# Сообщение для ненайденного поля, как в пакетной проверке
+NOT_FOUND_MESSAGE = "не найдено"
+
+
+def iter_error_records(plan, label, offer_errors):
+    """Записи выгрузки для ошибок одного товара"""
+    for field_index, check_index, value in offer_errors:
+        field = plan.fields[field_index]
+        if check_index == MISSING:
+            yield label, field.name, None, None, NOT_FOUND_MESSAGE
+        else:
+            yield (label, field.name, field.check_types[check_index], value,
+                   field.message(check_index, value))
+
+
+class CsvExport:
+    """Выгрузка в CSV с заголовком"""
+    def __init__(self, filename, plan):
+        self.plan = plan
+        self.file = open(filename, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, label, offer_errors):
+        self.writer.writerows(iter_error_records(self.plan, label, offer_errors))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesExport:
+    """Выгрузка в JSON Lines: по объекту на строку"""
+    def __init__(self, filename, plan):
+        self.plan = plan
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def write(self, label, offer_errors):
+        self.file.writelines(
+            self.encode(dict(zip(EXPORT_COLUMNS, record))) + '\n'
+            for record in iter_error_records(self.plan, label, offer_errors)
+        )
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExport:
+    """Выгрузка в Parquet группами строк по ROW_GROUP_SIZE записей.
+
+    Файл становится читаемым после close(), когда записан его футер.
+    """
+    ROW_GROUP_SIZE = 65536
+
+    def __init__(self, filename, plan):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Для выгрузки в Parquet установите pyarrow")
+        self.plan = plan
+        self.schema = pa.schema([(name, pa.string()) for name in EXPORT_COLUMNS])
+        self.writer = pq.ParquetWriter(filename, self.schema)
+        self.columns = [[] for _ in EXPORT_COLUMNS]
+
+    def write(self, label, offer_errors):
+        for record in iter_error_records(self.plan, label, offer_errors):
+            for column, item in zip(self.columns, record):
+                column.append(item)
+        if len(self.columns[0]) >= self.ROW_GROUP_SIZE:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if not self.columns[0]:
+            return
+        self.writer.write_table(pa.table(self.columns, schema=self.schema))
+        self.columns = [[] for _ in EXPORT_COLUMNS]
+
+    def flush(self):
+        # Неполную группу строк не пишем, чтобы не дробить файл
+        pass
+
+    def close(self):
+        try:
+            self._write_row_group()
+        finally:
+            self.writer.close()
+
+
+EXPORT_FORMATS = {
+    'csv': CsvExport,
+    'jsonl': JsonLinesExport,
+    'parquet': ParquetExport,
+}
+
+
+def open_export(filename, plan, export_format=None):
+    """Открывает выгрузку; формат по умолчанию определяется по расширению файла"""
+    if export_format is None:
+        export_format = filename.rsplit('.', 1)[-1].lower()
+    export_class = EXPORT_FORMATS.get(export_format)
+    if export_class is None:
+        raise ValueError(f"Неизвестный формат выгрузки: {export_format}")
+    return export_class(filename, plan)
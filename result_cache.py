@@ -0,0 +1,216 @@
+"""Кэш результатов проверки на диске (SQLite).
+
+Ошибки товара зависят только от конфигурации и значений его полей, поэтому
+результат хранится по хэшу конфигурации и подписи товара вместе с хэшем
+значений и используется повторно, только если хэш значений совпал. Если не
+изменились ни файл, ни конфигурация, повторно используется результат всего
+файла, и фид не читается вовсе.
+
+Хранятся результаты только MAX_CONFIGS последних использованных
+конфигураций: при подборе условий каждая правка дает новую конфигурацию, и
+без вытеснения файл кэша рос бы без ограничений.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from itertools import islice
+
+from feed_validator import BATCH_SIZE, validate_offers
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.feed_validator_cache.sqlite')
+
+# Меняется при изменении проверок, чтобы старые результаты не использовались
+CACHE_VERSION = 1
+
+# Сколько товаров сверяется с кэшем за один запрос
+CHUNK_SIZE = 20000
+# Сколько подписей товаров передается в одном SELECT
+LOOKUP_SIZE = 500
+# Результат всего файла сохраняется, только если ошибок не больше этого числа
+FEED_RESULT_LIMIT = 1000000
+# Сколько последних использованных конфигураций хранится в кэше
+MAX_CONFIGS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS offer_results (
+    config BLOB NOT NULL,
+    offer TEXT NOT NULL,
+    content BLOB NOT NULL,
+    errors TEXT NOT NULL,
+    PRIMARY KEY (config, offer)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS feed_results (
+    config BLOB NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    results BLOB NOT NULL,
+    PRIMARY KEY (config, path)
+);
+CREATE TABLE IF NOT EXISTS configs (
+    config BLOB PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+"""
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def config_hash(fields_conditions):
+    """Хэш конфигурации; порядок полей важен, так как ошибки ссылаются на номера полей"""
+    return _digest(json.dumps([CACHE_VERSION, list(fields_conditions.items())], ensure_ascii=False))
+
+
+def content_hash(field_names, values):
+    """Хэш значений проверяемых полей товара"""
+    return _digest(json.dumps([values.get(name) for name in field_names], ensure_ascii=False))
+
+
+def _encode_errors(offer_errors):
+    return ','.join(f"{field_index}:{check_index}" for field_index, check_index, _ in offer_errors)
+
+
+def _decode_errors(text, field_names, values):
+    # Значение ошибки - это значение поля товара, поэтому в кэше его не храним
+    offer_errors = []
+    if text:
+        for item in text.split(','):
+            field_index, check_index = item.split(':')
+            field_index = int(field_index)
+            offer_errors.append((field_index, int(check_index), values.get(field_names[field_index])))
+    return offer_errors
+
+
+def _lookup(connection, config, labels):
+    """Сохраненные (хэш значений, ошибки) по подписям товаров"""
+    cached = {}
+    unique_labels = list(dict.fromkeys(labels))
+    for start in range(0, len(unique_labels), LOOKUP_SIZE):
+        part = unique_labels[start:start + LOOKUP_SIZE]
+        query = ("SELECT offer, content, errors FROM offer_results "
+                 f"WHERE config = ? AND offer IN ({','.join('?' * len(part))})")
+        for offer, content, errors in connection.execute(query, [config] + part):
+            cached[offer] = (content, errors)
+    return cached
+
+
+def _validate_chunk(connection, config, fields_conditions, field_names, chunk, workers, columnar):
+    labels = [label for label, _ in chunk]
+    contents = [content_hash(field_names, values) for _, values in chunk]
+    cached = _lookup(connection, config, labels)
+
+    results = [None] * len(chunk)
+    misses = []
+    for position, (label, values) in enumerate(chunk):
+        hit = cached.get(label)
+        if hit is not None and hit[0] == contents[position]:
+            results[position] = _decode_errors(hit[1], field_names, values)
+        else:
+            misses.append(position)
+
+    if misses:
+        # Пул процессов нужен, только если изменилось много товаров
+        miss_workers = workers if len(misses) >= workers * BATCH_SIZE else 1
+        checked = validate_offers(fields_conditions, (chunk[position] for position in misses),
+                                  miss_workers, columnar=columnar)
+        rows = []
+        for position, (label, offer_errors) in zip(misses, checked):
+            results[position] = offer_errors
+            rows.append((config, label, contents[position], _encode_errors(offer_errors)))
+        connection.executemany("INSERT OR REPLACE INTO offer_results VALUES (?, ?, ?, ?)", rows)
+
+    return zip(labels, results)
+
+
+def _use_config(connection, config, max_configs=MAX_CONFIGS):
+    """Отмечает использование конфигурации и удаляет результаты давно не
+    использованных (вытеснение по давности использования)"""
+    known = connection.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+    if not known:
+        # Кэш без учета конфигураций (или новый): неизвестно, чьи в нем
+        # результаты, поэтому начинаем с пустого
+        connection.execute("DELETE FROM offer_results")
+        connection.execute("DELETE FROM feed_results")
+    connection.execute(
+        "INSERT OR REPLACE INTO configs VALUES (?, (SELECT COALESCE(MAX(used), 0) + 1 FROM configs))",
+        (config,)
+    )
+    evicted = [row[0] for row in connection.execute(
+        "SELECT config FROM configs ORDER BY used DESC LIMIT -1 OFFSET ?", (max_configs,)
+    )]
+    for old_config in evicted:
+        connection.execute("DELETE FROM offer_results WHERE config = ?", (old_config,))
+        connection.execute("DELETE FROM feed_results WHERE config = ?", (old_config,))
+        connection.execute("DELETE FROM configs WHERE config = ?", (old_config,))
+    connection.commit()
+
+
+def _replay(total, results):
+    """Результат всего файла в виде потока, как у validate_offers"""
+    position = 0
+    for offer_number, label, offer_errors in json.loads(zlib.decompress(results)):
+        # Товары без ошибок не сохраняются, для отчета важно только их число
+        for _ in range(offer_number - position):
+            yield None, []
+        yield label, [tuple(error) for error in offer_errors]
+        position = offer_number + 1
+    for _ in range(total - position):
+        yield None, []
+
+
+def validate_cached(cache_path, fields_conditions, filename, offers, workers=1, columnar=False):
+    """То же, что validate_offers, но с кэшем результатов в файле cache_path.
+
+    Проверяются только товары, значения которых изменились с прошлого раза.
+    Результат всего файла сохраняется, когда поток прочитан до конца.
+    """
+    connection = sqlite3.connect(cache_path)
+    try:
+        connection.executescript(SCHEMA)
+        config = config_hash(fields_conditions)
+        _use_config(connection, config, MAX_CONFIGS)
+        path = os.path.abspath(filename)
+        stat = os.stat(filename)
+
+        row = connection.execute(
+            "SELECT size, mtime, total, results FROM feed_results WHERE config = ? AND path = ?",
+            (config, path)
+        ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            yield from _replay(row[2], row[3])
+            return
+
+        field_names = list(fields_conditions)
+        # Товары с ошибками (номер в фиде, подпись, ошибки) для результата файла
+        recorded = []
+        error_count = 0
+        total = 0
+        offers = iter(offers)
+        while True:
+            chunk = list(islice(offers, CHUNK_SIZE))
+            if not chunk:
+                break
+            for label, offer_errors in _validate_chunk(connection, config, fields_conditions,
+                                                       field_names, chunk, workers, columnar):
+                if offer_errors and recorded is not None:
+                    error_count += len(offer_errors)
+                    if error_count > FEED_RESULT_LIMIT:
+                        recorded = None
+                    else:
+                        recorded.append((total, label, offer_errors))
+                total += 1
+                yield label, offer_errors
+            connection.commit()
+
+        if recorded is not None:
+            results = zlib.compress(json.dumps(recorded, ensure_ascii=False).encode('utf-8'))
+            connection.execute("INSERT OR REPLACE INTO feed_results VALUES (?, ?, ?, ?, ?, ?)",
+                               (config, path, stat.st_size, stat.st_mtime_ns, total, results))
+            connection.commit()
+    finally:
+        connection.close()
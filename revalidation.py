@@ -0,0 +1,180 @@
+"""Повторная проверка того же фида после правки конфигурации.
+
+При полной проверке значения полей всех товаров запоминаются по столбцам.
+Если затем меняются условия части полей, а файл остался прежним, фид не
+читается заново: заново проверяются только столбцы изменившихся полей, а
+ошибки остальных полей берутся из отчета прошлой проверки.
+
+Столбцы хранятся в словарном кодировании: номер уникального значения на
+товар и список уникальных значений, поэтому повторяющиеся значения занимают
+по 4 байта. Если снимок не помещается в BYTES_LIMIT, он не сохраняется.
+"""
+import os
+from array import array
+from collections import defaultdict
+from operator import itemgetter
+
+from rule_plan import RulePlan, MISSING
+
+# Сколько байт памяти может занять снимок (оценка), больше - снимок не сохраняется
+BYTES_LIMIT = 64 * 2 ** 20
+# Оценка памяти на одно уникальное значение сверх его длины: объект строки,
+# элемент списка и запись словаря кодирования
+UNIQUE_OVERHEAD = 160
+
+
+def file_signature(filename):
+    stat = os.stat(filename)
+    return os.path.abspath(filename), stat.st_size, stat.st_mtime_ns
+
+
+class SnapshotColumn:
+    """Столбец значений в словарном кодировании; код -1 - поле не найдено"""
+    def __init__(self):
+        self.codes = array('i')
+        self.uniques = []
+        self._unique_codes = {}
+
+    def append(self, value):
+        """Добавляет значение; возвращает прирост оценки памяти в байтах"""
+        if value is None:
+            self.codes.append(-1)
+            return 4
+        code = self._unique_codes.get(value)
+        if code is not None:
+            self.codes.append(code)
+            return 4
+        code = self._unique_codes[value] = len(self.uniques)
+        self.uniques.append(value)
+        self.codes.append(code)
+        return 4 + len(value) + UNIQUE_OVERHEAD
+
+    def freeze(self):
+        # Словарь нужен только для записи
+        self._unique_codes = None
+
+    def __iter__(self):
+        uniques = self.uniques
+        return (uniques[code] if code >= 0 else None for code in self.codes)
+
+
+class FeedSnapshot:
+    """Значения полей всех товаров последнего проверенного фида.
+
+    Снимок заполняется через record() во время полной проверки и становится
+    готовым после finish() с полным отчетом (Report) этой проверки.
+    """
+    def __init__(self, filename, field_names, bytes_limit=BYTES_LIMIT):
+        self.signature = file_signature(filename)
+        self.labels = []
+        # Имя поля -> SnapshotColumn значений по номерам товаров
+        self.columns = {name: SnapshotColumn() for name in field_names}
+        self.bytes_limit = bytes_limit
+        # Все ли товары фида попали в снимок
+        self.complete = False
+        # Конфигурация и отчет, которым соответствуют сохраненные ошибки
+        self.fields_conditions = None
+        self.report = None
+
+    def record(self, offers):
+        """Пропускает поток товаров, запоминая их значения"""
+        columns = list(self.columns.items())
+        recording = True
+        size = 0
+        for label, values in offers:
+            if recording:
+                size += len(label) + UNIQUE_OVERHEAD
+                for name, column in columns:
+                    size += column.append(values.get(name))
+                self.labels.append(label)
+                if size > self.bytes_limit:
+                    # Фид слишком большой: освобождаем память и просто пропускаем товары
+                    recording = False
+                    self.labels = []
+                    self.columns = {}
+                    columns = []
+            yield label, values
+        for _, column in columns:
+            column.freeze()
+        self.complete = recording
+
+    def finish(self, fields_conditions, report):
+        """Запоминает отчет проверки, прошедшей по всем товарам снимка"""
+        if self.complete:
+            self.fields_conditions = fields_conditions
+            self.report = report
+
+    @property
+    def ready(self):
+        return self.report is not None
+
+    def can_recheck(self, filename, fields_conditions):
+        """Можно ли проверить фид по снимку, не читая файл"""
+        if not self.ready:
+            return False
+        try:
+            if file_signature(filename) != self.signature:
+                return False
+        except OSError:
+            return False
+        return all(name in self.columns for name in fields_conditions)
+
+    def changed_fields(self, fields_conditions):
+        """Номера полей новой конфигурации, условия которых изменились"""
+        return [
+            field_index
+            for field_index, (name, field_info) in enumerate(fields_conditions.items())
+            if self.fields_conditions.get(name) != field_info
+        ]
+
+    def recheck(self, fields_conditions):
+        """Результаты проверки с новой конфигурацией, как у validate_offers.
+
+        Проверяются только поля, условия которых изменились; ошибки остальных
+        полей переносятся из сохраненного отчета с новыми номерами полей.
+        """
+        report = self.report
+        plan = RulePlan(fields_conditions)
+        changed = set(self.changed_fields(fields_conditions))
+        # Номер поля в старом отчете -> номер в новой конфигурации
+        old_indexes = {name: field_index for field_index, name in enumerate(self.fields_conditions)}
+        reused = {
+            old_indexes[field.name]: field_index
+            for field_index, field in enumerate(plan)
+            if field_index not in changed
+        }
+
+        # Ошибки изменившихся полей по номерам товаров
+        new_errors = defaultdict(list)
+        for field_index in sorted(changed):
+            field = plan.fields[field_index]
+            column = self.columns[field.name]
+            # Каждое уникальное значение проверяем один раз
+            failed = [field.failed_checks(value) for value in column.uniques]
+            failed.append([MISSING])
+            uniques = column.uniques + [None]
+            for offer_number, code in enumerate(column.codes):
+                check_indexes = failed[code]
+                if check_indexes:
+                    value = uniques[code]
+                    for check_index in check_indexes:
+                        new_errors[offer_number].append((field_index, check_index, value))
+
+        offer_numbers = report.offer_numbers
+        old_offer = 0
+        for offer_number, label in enumerate(self.labels):
+            offer_errors = []
+            if old_offer < len(offer_numbers) and offer_numbers[old_offer] == offer_number:
+                for error_index in report.offer_errors(old_offer):
+                    field_index = reused.get(report.error_fields[error_index])
+                    if field_index is not None:
+                        offer_errors.append((field_index, report.error_checks[error_index],
+                                             report.error_value(error_index)))
+                old_offer += 1
+            added = new_errors.get(offer_number)
+            if added:
+                offer_errors.extend(added)
+            if len(offer_errors) > 1:
+                # Порядок ошибок тот же, что у check_offer: по номерам полей
+                offer_errors.sort(key=itemgetter(0))
+            yield label, offer_errors
@@ -0,0 +1,362 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+# Форматы дат, которые понимает условие "Диапазон дат", в порядке перебора
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%d.%m.%Y",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S"
+]
+
+# Быстрый разбор для каждого формата: выражение, которое принимает только
+# строки, заведомо понятные strptime в этом формате, и номера групп года,
+# месяца и дня. Строки вне этого вида разбираются обычным перебором форматов.
+FAST_DATE_PATTERNS = {
+    "%Y-%m-%d": (re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII), (1, 2, 3)),
+    "%d.%m.%Y": (re.compile(r'(\d{2})\.(\d{2})\.(\d{4})', re.ASCII), (3, 2, 1)),
+    "%Y-%m-%dT%H:%M:%S": (
+        re.compile(r'(\d{4})-(\d{2})-(\d{2})T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d', re.ASCII),
+        (1, 2, 3)
+    ),
+    "%Y-%m-%d %H:%M:%S": (
+        re.compile(r'(\d{4})-(\d{2})-(\d{2}) (?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d', re.ASCII),
+        (1, 2, 3)
+    ),
+}
+
+
+class DateParser:
+    """Разбор дат столбца с определением формата по первым значениям.
+
+    Первые SAMPLE_SIZE значений разбираются перебором DATE_FORMATS, после
+    чего самый частый формат становится быстрым путем. Перебор остальных
+    форматов нужен только при промахе, повторяющиеся строки берутся из кэша.
+    """
+    SAMPLE_SIZE = 20
+    CACHE_SIZE = 100000
+
+    def __init__(self):
+        self.format_hits = [0] * len(DATE_FORMATS)
+        self.sampled = 0
+        self.fast_pattern = None
+        self.fast_groups = None
+        self.cache = {}
+
+    def parse(self, value):
+        """Дата из строки или None, если ни один формат не подошел"""
+        try:
+            return self.cache[value]
+        except KeyError:
+            pass
+
+        date_value = None
+        if self.fast_pattern is not None:
+            match = self.fast_pattern.fullmatch(value)
+            if match:
+                year, month, day = self.fast_groups
+                try:
+                    date_value = date(int(match[year]), int(match[month]), int(match[day]))
+                except ValueError:
+                    date_value = None
+        if date_value is None:
+            date_value = self._parse_formats(value)
+
+        if len(self.cache) >= self.CACHE_SIZE:
+            self.cache.clear()
+        self.cache[value] = date_value
+        return date_value
+
+    def _parse_formats(self, value):
+        for format_index, date_format in enumerate(DATE_FORMATS):
+            try:
+                date_value = datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+            if self.fast_pattern is None:
+                self._learn(format_index)
+            return date_value
+        if self.fast_pattern is None:
+            self._learn(None)
+        return None
+
+    def _learn(self, format_index):
+        if format_index is not None:
+            self.format_hits[format_index] += 1
+        self.sampled += 1
+        if self.sampled >= self.SAMPLE_SIZE and any(self.format_hits):
+            best = self.format_hits.index(max(self.format_hits))
+            self.fast_pattern, self.fast_groups = FAST_DATE_PATTERNS[DATE_FORMATS[best]]
+
+
+# Классы символов маски ввода в том виде, как они описаны в справке редактора
+MASK_CLASSES = {
+    'd': '0-9',
+    'D': 'A-Za-z',
+    'w': 'A-Za-z0-9',
+    's': ' ',
+}
+
+
+def _mask_set(body):
+    """Содержимое набора [...] маски в виде набора регулярного выражения"""
+    parts = []
+    i = 0
+    if body.startswith('^'):
+        parts.append('^')
+        i = 1
+    while i < len(body):
+        char = body[i]
+        if char == '\\' and i + 1 < len(body):
+            escaped = body[i + 1]
+            parts.append(MASK_CLASSES.get(escaped, re.escape(escaped)))
+            i += 2
+            continue
+        # Дефис между символами задает диапазон, например [A-F]
+        parts.append(char if char == '-' else re.escape(char))
+        i += 1
+    return '[' + ''.join(parts) + ']'
+
+
+@lru_cache(maxsize=None)
+def compile_mask(pattern):
+    """Перевод маски ввода в регулярное выражение для всего значения.
+
+    \\d - цифра, \\D - латинская буква, \\w - буква или цифра, \\s - пробел,
+    [...] - набор допустимых символов, остальные символы совпадают буквально.
+    Результат кэшируется, так что каждая маска компилируется один раз.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if escaped in MASK_CLASSES:
+                parts.append('[' + MASK_CLASSES[escaped] + ']')
+            else:
+                parts.append(re.escape(escaped))
+            i += 2
+        elif char == '[' and pattern.find(']', i + 2) != -1:
+            # Закрывающая скобка сразу после открывающей считается символом набора
+            end = pattern.find(']', i + 2)
+            parts.append(_mask_set(pattern[i + 1:end]))
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return re.compile(''.join(parts))
+
+
+class LengthCheck:
+    """Условие "Длина" """
+    def __init__(self, values):
+        self.min = values['min']
+        self.max = values['max']
+
+    def __call__(self, value):
+        try:
+            length = len(str(value))
+            if length < self.min:
+                return f"длина меньше минимальной ({length} < {self.min})"
+            if length > self.max:
+                return f"длина больше максимальной ({length} > {self.max})"
+        except Exception as e:
+            return f"ошибка проверки значения: {str(e)}"
+        return None
+
+
+class MaskCheck:
+    """Условие "Маска": значение должно целиком соответствовать маске"""
+    def __init__(self, values):
+        self.pattern = values['pattern']
+        self.regex = compile_mask(self.pattern)
+
+    def __call__(self, value):
+        if not self.regex.fullmatch(str(value)):
+            return f"не соответствует маске '{self.pattern}'"
+        return None
+
+
+class IntRangeCheck:
+    """Условие "Диапазон" для целых чисел"""
+    def __init__(self, values):
+        self.bounds_error = None
+        try:
+            self.min = int(values['min'])
+            self.max = int(values['max'])
+        except ValueError as e:
+            # Некорректная граница делает любое значение ошибочным,
+            # как и при разборе границ на каждой проверке
+            self.bounds_error = e
+
+    def __call__(self, value):
+        try:
+            num_value = int(float(str(value).replace(',', '.')))
+            if self.bounds_error is not None:
+                raise self.bounds_error
+            if num_value < self.min:
+                return f"значение меньше минимального ({num_value} < {self.min})"
+            if num_value > self.max:
+                return f"значение больше максимального ({num_value} > {self.max})"
+        except ValueError:
+            return f"значение '{value}' не является целым числом"
+        except Exception as e:
+            return f"ошибка проверки значения: {str(e)}"
+        return None
+
+
+class FloatRangeCheck:
+    """Условие "Диапазон" для дробных чисел и денег"""
+    def __init__(self, values):
+        self.bounds_error = None
+        try:
+            self.min = float(values['min'])
+            self.max = float(values['max'])
+        except ValueError as e:
+            self.bounds_error = e
+
+    def __call__(self, value):
+        try:
+            num_value = float(str(value).replace(',', '.'))
+            if self.bounds_error is not None:
+                raise self.bounds_error
+            if num_value < self.min:
+                return f"значение меньше минимального ({num_value} < {self.min})"
+            if num_value > self.max:
+                return f"значение больше максимального ({num_value} > {self.max})"
+        except ValueError:
+            return f"значение '{value}' не является числом"
+        except Exception as e:
+            return f"ошибка проверки значения: {str(e)}"
+        return None
+
+
+class DateRangeCheck:
+    """Условие "Диапазон дат" с заранее разобранными границами"""
+    def __init__(self, values):
+        self.parser = DateParser()
+        self.bounds_error = None
+        try:
+            self.min = datetime.strptime(values['min'], "%Y-%m-%d").date()
+            self.max = datetime.strptime(values['max'], "%Y-%m-%d").date()
+        except ValueError as e:
+            self.bounds_error = e
+
+    def __call__(self, value):
+        try:
+            date_value = self.parser.parse(str(value))
+            if date_value is None:
+                return f"неверный формат даты '{value}'"
+            if self.bounds_error is not None:
+                return f"ошибка проверки даты: {str(self.bounds_error)}"
+
+            if date_value < self.min:
+                return f"дата раньше минимальной ({date_value} < {self.min})"
+            if date_value > self.max:
+                return f"дата позже максимальной ({date_value} > {self.max})"
+        except Exception as e:
+            return f"ошибка проверки значения: {str(e)}"
+        return None
+
+
+class PrecisionCheck:
+    """Условие "Точность" """
+    def __init__(self, values):
+        self.precision = values['precision']
+
+    def __call__(self, value):
+        try:
+            value_str = str(value).replace(',', '.')
+            if '.' in value_str:
+                decimal_places = len(value_str.split('.')[-1])
+                if decimal_places > self.precision:
+                    return f"слишком много знаков после запятой ({decimal_places} > {self.precision})"
+        except Exception as e:
+            return f"ошибка проверки значения: {str(e)}"
+        return None
+
+
+class BrokenCheck:
+    """Условие, которое не удалось скомпилировать: каждое значение получает
+    ту же ошибку, что и при разборе условия на лету"""
+    def __init__(self, error):
+        self.error = error
+
+    def __call__(self, value):
+        return f"ошибка проверки значения: {str(self.error)}"
+
+
+def compile_condition(condition, field_type):
+    """Превращает условие из конфигурации в готовый объект проверки.
+
+    Возвращает None, если условие для данного типа поля ничего не проверяет.
+    """
+    condition_type = condition['type']
+    if condition_type == "Длина":
+        check_class = LengthCheck
+    elif condition_type == "Маска":
+        check_class = MaskCheck
+    elif condition_type == "Диапазон":
+        if field_type == "number":
+            check_class = IntRangeCheck
+        elif field_type in ["float", "money"]:
+            check_class = FloatRangeCheck
+        else:
+            return None
+    elif condition_type == "Диапазон дат":
+        check_class = DateRangeCheck
+    elif condition_type == "Точность" and field_type in ["float", "money"]:
+        check_class = PrecisionCheck
+    else:
+        return None
+
+    try:
+        return check_class(condition['values'])
+    except Exception as e:
+        return BrokenCheck(e)
+
+
+# Номер проверки в записи об ошибке, когда поле не найдено в товаре
+MISSING = -1
+
+
+class FieldRule:
+    """Поле конфигурации со скомпилированными условиями"""
+    def __init__(self, name, field_type, conditions):
+        self.name = name
+        self.type = field_type
+        self.checks = []
+        # Тип условия для каждой проверки, в том же порядке
+        self.check_types = []
+        for condition in conditions:
+            check = compile_condition(condition, field_type)
+            if check is not None:
+                self.checks.append(check)
+                self.check_types.append(condition['type'])
+
+    def failed_checks(self, value):
+        """Номера проверок поля, которые значение не прошло"""
+        return [check_index for check_index, check in enumerate(self.checks) if check(value)]
+
+    def message(self, check_index, value):
+        """Текст ошибки проверки; для MISSING - None"""
+        if check_index == MISSING:
+            return None
+        return self.checks[check_index](value)
+
+
+class RulePlan:
+    """План проверки: конфигурация полей, один раз скомпилированная в проверки"""
+    def __init__(self, fields_conditions):
+        self.fields = [
+            FieldRule(field_name, field_info['type'], field_info['conditions'])
+            for field_name, field_info in fields_conditions.items()
+        ]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
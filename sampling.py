@@ -0,0 +1,109 @@
+"""Случайная выборка товаров из потока и оценка долей ошибок по выборке."""
+import math
+import random
+from itertools import islice
+
+# Квантиль нормального распределения для 95% доверительного интервала
+Z_95 = 1.959963984540054
+
+
+def wilson_interval(errors, sample_size, z=Z_95):
+    """Доверительный интервал Уилсона для доли errors / sample_size"""
+    if sample_size == 0:
+        return 0.0, 1.0
+    rate = errors / sample_size
+    z2 = z * z
+    denominator = 1 + z2 / sample_size
+    center = (rate + z2 / (2 * sample_size)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / sample_size
+                           + z2 / (4 * sample_size * sample_size)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _same(offer):
+    return offer
+
+
+class OfferSample:
+    """Случайная выборка из потока товаров за один проход.
+
+    size - выборка фиксированного размера (резервуарная выборка, алгоритм L),
+    fraction - каждый товар попадает в выборку с этой вероятностью. Пропуски
+    между выбранными товарами считаются сразу, поэтому на пропущенный товар
+    не тратится ни одного случайного числа. Выбранные товары отдаются в
+    порядке фида, seen - сколько товаров прочитано всего.
+
+    Выборка берется из сырых товаров (элементов XML, строк XLSX), а в
+    значения полей функцией convert разбираются только выбранные. Сам файл
+    все равно читается целиком, так что время чтения - нижняя граница
+    времени проверки выборки.
+    """
+    def __init__(self, size=None, fraction=None, seed=None):
+        if (size is None) == (fraction is None):
+            raise ValueError("Нужно указать либо размер выборки, либо долю")
+        if size is not None and size <= 0:
+            raise ValueError("Размер выборки должен быть больше нуля")
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError("Доля выборки должна быть от 0 до 1")
+        self.size = size
+        self.fraction = fraction
+        self.random = random.Random(seed)
+        self.seen = 0
+        # Функция без аргументов; когда она возвращает True, чтение прекращается
+        self.should_stop = None
+
+    def __call__(self, offers, convert=None):
+        """Выбранные товары потока offers, преобразованные convert.
+
+        Товар преобразуется сразу при выборе, до чтения следующего, поэтому
+        поток может переиспользовать свои объекты (как iter_xml_offers).
+        """
+        self.seen = 0
+        offers = self._count(offers)
+        if convert is None:
+            convert = _same
+        if self.size is not None:
+            return self._reservoir(offers, convert)
+        return self._bernoulli(offers, convert)
+
+    def _count(self, offers):
+        for offer in offers:
+            if self.seen % 1000 == 0 and self.should_stop is not None and self.should_stop():
+                return
+            self.seen += 1
+            yield offer
+
+    def _uniform(self):
+        # Значение из (0, 1], чтобы логарифм был определен
+        return 1.0 - self.random.random()
+
+    def _reservoir(self, offers, convert):
+        size = self.size
+        reservoir = [(position, convert(offer))
+                     for position, offer in enumerate(islice(offers, size))]
+        if len(reservoir) == size:
+            weight = math.exp(math.log(self._uniform()) / size)
+            while True:
+                skip = math.floor(math.log(self._uniform()) / math.log(1 - weight)) \
+                    if weight < 1 else 0
+                offer = next(islice(offers, skip, None), None)
+                if offer is None:
+                    break
+                reservoir[self.random.randrange(size)] = (self.seen - 1, convert(offer))
+                weight *= math.exp(math.log(self._uniform()) / size)
+
+        reservoir.sort(key=lambda item: item[0])
+        for _, offer in reservoir:
+            yield offer
+
+    def _bernoulli(self, offers, convert):
+        if self.fraction >= 1:
+            yield from map(convert, offers)
+            return
+        log_keep = math.log(1 - self.fraction)
+        while True:
+            skip = math.floor(math.log(self._uniform()) / log_keep)
+            offer = next(islice(offers, skip, None), None)
+            if offer is None:
+                return
+            yield convert(offer)
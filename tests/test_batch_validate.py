@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_validate import main, EXIT_FAILURE
+
+
+def test_unwritable_output(tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text('[]', encoding='utf-8')
+    feed = tmp_path / 'feed.xml'
+    feed.write_text('<shop><offers><offer id="1"/></offers></shop>', encoding='utf-8')
+    output = tmp_path / 'missing' / 'result.json'
+    assert main([str(config), str(feed), '-o', str(output)]) == EXIT_FAILURE
@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from column_cache import ColumnCache, ColumnReader, ColumnWriter
+
+
+def make_reader(offers, calls):
+    def read_values(filename, field_names):
+        calls.append(list(field_names))
+        for label, values in offers:
+            yield label, {name: values.get(name) for name in field_names}
+    return read_values
+
+
+def test_no_fields(tmp_path):
+    feed = tmp_path / 'feed.xml'
+    feed.write_text('<offers/>', encoding='utf-8')
+    offers = [("ID: 1", {'price': '10'}), ("ID: 2", {'price': None})]
+    calls = []
+    read_values = make_reader(offers, calls)
+    cache = ColumnCache(str(tmp_path / 'cache'))
+
+    assert list(cache.iter_values(str(feed), [], read_values)) == [("ID: 1", {}), ("ID: 2", {})]
+    # Подписи сохранены без столбцов полей, файл больше не читается
+    assert list(cache.iter_values(str(feed), [], read_values)) == [("ID: 1", {}), ("ID: 2", {})]
+    assert calls == [[]]
+
+    # Столбец поля добавляется к уже сохраненным подписям
+    expected = [("ID: 1", {'price': '10'}), ("ID: 2", {'price': None})]
+    assert list(cache.iter_values(str(feed), ['price'], read_values)) == expected
+    assert list(cache.iter_values(str(feed), ['price'], read_values)) == expected
+    assert calls == [[], ['price']]
+
+
+def test_replay_matches_read(tmp_path, monkeypatch):
+    # Маленький словарь, чтобы проверить повторную запись вытесненных значений
+    monkeypatch.setattr(ColumnWriter, 'DEDUP_LIMIT', 3)
+    monkeypatch.setattr(ColumnReader, 'DECODE_CACHE_SIZE', 2)
+    feed = tmp_path / 'feed.xml'
+    feed.write_text('<offers/>', encoding='utf-8')
+    offers = [
+        (f"ID: {number}", {
+            'id': str(number),
+            'color': ['красный', 'синий', '', None][number % 4],
+            'text': "описание \ud800 " * (number % 5) if number % 7 else None,
+        })
+        for number in range(500)
+    ]
+    calls = []
+    read_values = make_reader(offers, calls)
+    cache = ColumnCache(str(tmp_path / 'cache'))
+
+    # Недочитанный поток ничего не сохраняет
+    stream = cache.iter_values(str(feed), ['id', 'color'], read_values)
+    next(stream)
+    stream.close()
+
+    for field_names in (['id', 'color'], ['id', 'color'], ['text', 'id'], ['color', 'text']):
+        expected = [(label, {name: values[name] for name in field_names})
+                    for label, values in offers]
+        assert list(cache.iter_values(str(feed), field_names, read_values)) == expected
+    assert calls == [['id', 'color'], ['id', 'color'], ['text']]
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar_checks import COLUMNAR_AVAILABLE
+from feed_validator import validate_offers
+
+pytestmark = pytest.mark.skipif(not COLUMNAR_AVAILABLE, reason="нужны numpy 2 и pandas")
+
+
+def condition(condition_type, field_type, values):
+    return {'type': condition_type, 'field_type': field_type, 'values': values}
+
+
+FIELDS_CONDITIONS = {
+    'count': {'type': 'number', 'conditions': [
+        condition("Диапазон", 'number', {'min': 0, 'max': 100})]},
+    'price': {'type': 'float', 'conditions': [
+        condition("Диапазон", 'float', {'min': 0, 'max': 100}),
+        condition("Точность", 'float', {'precision': 2})]},
+    'date': {'type': 'date', 'conditions': [
+        condition("Диапазон дат", 'date', {'min': '2000-01-01', 'max': '2030-12-31'})]},
+    'code': {'type': 'text', 'conditions': [
+        condition("Длина", 'text', {'min': 1, 'max': 8}),
+        condition("Маска", 'text', {'pattern': '\\D\\D-\\d\\d'})]},
+}
+
+NUMBERS = ['5', '5.5', '5,5', '-1', '100', '100.0000000001', '1e2', '1E+2', '5e 1', '1E +1',
+           '5\x00', ' 5', '5 ', '0x10', 'inf', '-inf', 'nan', '1_0', '١٢', '.5', '5.', '',
+           '+5', '1e400', '99.999999999999', 'abc']
+DATES = ['2024-01-01', '2024-12-30T10:00:60', '2024-12-30T24:00:00', '2024-12-30 10:00:00',
+         '2024-02-30', '2024-1-2', '01.02.2020', '1.2.2020', '9999-12-31', '0001-01-01',
+         '2024-01-01T10:00', '2024-01-01 ', '2030-12-31T23:59:59', '1999-12-31', 'x', '']
+CODES = ['AB-12', 'ab-12', 'AB-123', 'AB12', 'АБ-12', '', 'ABCDEFGHIJ']
+
+
+def offers(count, seed):
+    rng = random.Random(seed)
+    for number in range(count):
+        values = {
+            'count': rng.choice(NUMBERS),
+            'price': rng.choice(NUMBERS),
+            'date': rng.choice(DATES),
+            'code': rng.choice(CODES),
+        }
+        # Иногда поле отсутствует
+        if rng.random() < 0.05:
+            del values[rng.choice(list(values))]
+        yield f"ID: {number}", values
+
+
+def test_columnar_matches_sequential():
+    sequential = list(validate_offers(FIELDS_CONDITIONS, offers(5000, 1)))
+    columnar = list(validate_offers(FIELDS_CONDITIONS, offers(5000, 1), batch_size=700,
+                                    columnar=True))
+    assert columnar == sequential
+    assert any(offer_errors for _, offer_errors in sequential)
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, 'benchmarks'), os.path.join(ROOT_DIR, 'FeedErrorCorrection')]
+
+from data_parser import DataParser
+from feed_generator import generate, validator_rules
+from validator import Validator
+
+RULES = {
+    'x': {'type': 'ЦЕЛОЕ', 'min': 0, 'max': 10},
+    'y': {'type': 'СТРОКА', 'allowed_chars': '0123456789'},
+}
+
+# Row types change between chunks of two rows: whole numbers, a gap, text
+VALUES = [('x', 2), (2, None), (5.5, 12), (3, 4)]
+
+
+def chunked_errors(validator, path, chunk_size):
+    return validator.validate_chunks(DataParser.iter_chunks(path, chunk_size))
+
+
+def test_csv_chunks_read_like_whole_file(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text('x\nx\n2\n5.5\n3\n', encoding='utf-8')
+    validator = Validator(RULES)
+    errors = validator.validate(DataParser.parse_file(str(path)))
+    assert [index for index, _, _, _ in errors] == [0, 2]
+    assert chunked_errors(validator, str(path), 2) == errors
+
+
+@pytest.mark.parametrize('feed_format', ['csv', 'json', 'xlsx'])
+def test_mixed_types_match_whole_file(tmp_path, feed_format):
+    path = str(tmp_path / f'feed.{feed_format}')
+    if feed_format == 'csv':
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('x,y\n' + ''.join(f"{x},{'' if y is None else y}\n" for x, y in VALUES))
+    elif feed_format == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{'x': x, 'y': y} for x, y in VALUES], f)
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook()
+        workbook.active.append(['x', 'y'])
+        for row in VALUES:
+            workbook.active.append(row)
+        workbook.save(path)
+
+    validator = Validator(RULES)
+    errors = validator.validate(DataParser.parse_file(path))
+    assert errors
+    for chunk_size in (1, 2, 3):
+        assert chunked_errors(validator, path, chunk_size) == errors
+
+
+@pytest.mark.parametrize('feed_format', ['csv', 'json', 'xml', 'xlsx'])
+def test_generated_feed_chunks_match_whole_file(tmp_path, feed_format):
+    path = str(tmp_path / f'feed.{feed_format}')
+    generate(path, feed_format, 500, 4, 0.2)
+    validator = Validator(validator_rules())
+    errors = validator.validate(DataParser.parse_file(path))
+    assert errors
+    assert chunked_errors(validator, path, 70) == errors
@@ -0,0 +1,28 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'benchmarks')]
+
+from feed_generator import field_config, generate
+from feed_reader import iter_xml_values
+from feed_validator import build_report, fields_conditions_from_config, validate_offers
+
+
+def test_workers_match_serial(tmp_path):
+    feed = str(tmp_path / 'feed.xml')
+    generate(feed, 'xml', 3000, 10, 0.1)
+    fields_conditions = fields_conditions_from_config(field_config(10))
+
+    def check(workers, batch_size):
+        offers = iter_xml_values(feed, list(fields_conditions))
+        return list(validate_offers(fields_conditions, offers, workers, batch_size))
+
+    serial = check(1, 2000)
+    assert any(offer_errors for _, offer_errors in serial)
+    # Пачек больше, чем процессов, и последняя пачка неполная
+    assert check(2, 170) == serial
+    assert check(3, 5000) == serial
+
+    report = build_report(fields_conditions, iter(serial))
+    assert report.total_offers == 3000
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'benchmarks')]
+
+from feed_generator import field_config, generate
+from feed_reader import iter_xml_values
+from feed_validator import fields_conditions_from_config, validate_offers
+import result_cache
+from result_cache import validate_cached
+
+
+def make_feed(path, error_rate, seed=0):
+    generate(str(path), 'xml', 2000, 8, error_rate, seed)
+    return str(path)
+
+
+def run(cache_path, fields_conditions, feed):
+    offers = iter_xml_values(feed, list(fields_conditions))
+    return list(validate_cached(str(cache_path), fields_conditions, feed, offers))
+
+
+def plain(fields_conditions, feed):
+    return list(validate_offers(fields_conditions, iter_xml_values(feed, list(fields_conditions))))
+
+
+def test_cached_results_match(tmp_path):
+    fields_conditions = fields_conditions_from_config(field_config(8))
+    cache_path = tmp_path / 'cache.sqlite'
+    feed = make_feed(tmp_path / 'feed.xml', 0.05)
+    expected = plain(fields_conditions, feed)
+    # Первая проверка, повтор по товарам и повтор результата всего файла
+    assert run(cache_path, fields_conditions, feed) == expected
+    os.utime(feed)
+    assert run(cache_path, fields_conditions, feed) == expected
+    replayed = run(cache_path, fields_conditions, feed)
+    assert [errors for _, errors in replayed] == [errors for _, errors in expected]
+
+    # Часть товаров изменилась: их результаты не берутся из кэша
+    changed = make_feed(tmp_path / 'feed.xml', 0.2, seed=1)
+    assert run(cache_path, fields_conditions, changed) == plain(fields_conditions, changed)
+
+
+def test_old_configs_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'MAX_CONFIGS', 2)
+    cache_path = tmp_path / 'cache.sqlite'
+    feed = make_feed(tmp_path / 'feed.xml', 0.05)
+    config = field_config(8)
+    hashes = []
+    for max_length in (100, 110, 120):
+        config[0]['conditions'][0]['values']['max'] = max_length
+        fields_conditions = fields_conditions_from_config(config)
+        hashes.append(result_cache.config_hash(fields_conditions))
+        run(cache_path, fields_conditions, feed)
+
+    with sqlite3.connect(str(cache_path)) as connection:
+        stored = {row[0] for row in connection.execute("SELECT DISTINCT config FROM offer_results")}
+        feeds = {row[0] for row in connection.execute("SELECT config FROM feed_results")}
+    assert stored == feeds == set(hashes[1:])
@@ -0,0 +1,54 @@
+import copy
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'benchmarks')]
+
+from feed_generator import field_config, generate
+from feed_reader import iter_xml_values
+from feed_validator import Report, fields_conditions_from_config, validate_offers
+from revalidation import FeedSnapshot
+from rule_plan import RulePlan
+
+
+def full_check(feed, fields_conditions, snapshot=None):
+    offers = iter_xml_values(feed, list(fields_conditions))
+    if snapshot is not None:
+        offers = snapshot.record(offers)
+    results = list(validate_offers(fields_conditions, offers))
+    if snapshot is not None:
+        report = Report(RulePlan(fields_conditions))
+        for label, offer_errors in results:
+            report.add(label, offer_errors)
+        snapshot.finish(fields_conditions, report)
+    return results
+
+
+def test_recheck_matches_full_check(tmp_path):
+    feed = str(tmp_path / 'feed.xml')
+    generate(feed, 'xml', 2000, 10, 0.1)
+    config = field_config(10)
+    fields_conditions = fields_conditions_from_config(config)
+    snapshot = FeedSnapshot(feed, list(fields_conditions))
+    full_check(feed, fields_conditions, snapshot)
+    assert snapshot.ready
+
+    edited = copy.deepcopy(config)
+    # Изменены условия цены, убрано поле, поля переставлены
+    edited[2]['conditions'][0]['values']['max'] = 30000
+    del edited[4]
+    edited.reverse()
+    edited_conditions = fields_conditions_from_config(edited)
+    assert snapshot.can_recheck(feed, edited_conditions)
+    assert list(snapshot.recheck(edited_conditions)) == full_check(feed, edited_conditions)
+
+
+def test_snapshot_over_budget(tmp_path):
+    feed = str(tmp_path / 'feed.xml')
+    generate(feed, 'xml', 2000, 10, 0.1)
+    fields_conditions = fields_conditions_from_config(field_config(10))
+    snapshot = FeedSnapshot(feed, list(fields_conditions), bytes_limit=100000)
+    assert full_check(feed, fields_conditions, snapshot) == full_check(feed, fields_conditions)
+    assert not snapshot.ready
+    assert not snapshot.columns
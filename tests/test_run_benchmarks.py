@@ -0,0 +1,19 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+import run_benchmarks
+
+
+def test_failed_case_exit_code(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_benchmarks, 'run_isolated',
+                        lambda case, path, fields, options: {'error': "TypeError: сбой"})
+    argv = ['--offers', '10', '--cases', 'DataParser.parse_file', '--formats', 'csv',
+            '--data-dir', str(tmp_path)]
+    assert run_benchmarks.main(argv) == 1
+
+    monkeypatch.setattr(run_benchmarks, 'run_isolated',
+                        lambda case, path, fields, options: {'seconds': 0.1, 'offers': 10})
+    assert run_benchmarks.main(argv) == 0
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'benchmarks')]
+
+from feed_generator import generate
+from feed_reader import iter_xml_values
+from sampling import OfferSample, wilson_interval
+
+FIELD_NAMES = ['name', 'price', 'Свойство 1']
+
+
+@pytest.fixture(scope='module')
+def feed(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('feeds') / 'feed.xml')
+    generate(path, 'xml', 3000, 8, 0.05)
+    return path
+
+
+@pytest.mark.parametrize('options', [{'fraction': 0.05}, {'fraction': 1}, {'size': 200},
+                                     {'size': 5000}])
+def test_sample_before_indexing(feed, options):
+    # Выборка из элементов XML та же, что из уже разобранных значений
+    all_offers = list(iter_xml_values(feed, FIELD_NAMES))
+    sample = OfferSample(seed=7, **options)
+    sampled = list(iter_xml_values(feed, FIELD_NAMES, sample=sample))
+    assert sampled == list(OfferSample(seed=7, **options)(iter(all_offers)))
+    assert sample.seen == len(all_offers)
+    # Товары выборки идут в порядке фида
+    positions = [all_offers.index(offer) for offer in sampled]
+    assert positions == sorted(positions)
+    if 'size' in options:
+        assert len(sampled) == min(options['size'], len(all_offers))
+
+
+def test_should_stop(feed):
+    sample = OfferSample(fraction=0.5, seed=1)
+    sample.should_stop = lambda: sample.seen >= 1000
+    list(iter_xml_values(feed, FIELD_NAMES, sample=sample))
+    assert sample.seen == 1000
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 1000)
+    assert low < 0.05 < high
+    assert wilson_interval(0, 100)[0] == pytest.approx(0.0, abs=1e-12)
+    assert wilson_interval(100, 100)[1] == pytest.approx(1.0)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'FeedErrorCorrection'))
+
+from validator import Validator, _strptime_format
+
+RULES = {
+    'date': {'type': 'ДАТА', 'date_format': 'DD.MM.YYYY'},
+    'updated': {'type': 'ДАТА', 'date_format': ''},
+    'count': {'type': 'ЦЕЛОЕ', 'min': 0, 'max': 10},
+}
+
+
+def test_date_format_translation():
+    assert _strptime_format('YYYY-MM-DD') == '%Y-%m-%d'
+    assert _strptime_format('DD.MM.YY HH:mm:ss') == '%d.%m.%y %H:%M:%S'
+    assert _strptime_format('%d/%m/%Y') == '%d/%m/%Y'
+
+
+def test_empty_dates_are_valid():
+    data = pd.DataFrame({
+        'date': ['01.02.2024', '', None, '2024-02-01', '31.02.2024'],
+        'updated': ['2024-02-01', None, '', 'вчера', pd.Timestamp('2024-02-01')],
+    }, dtype=object)
+    errors = Validator(RULES).validate(data)
+    assert [(index, field) for index, field, _, _ in errors] == [
+        (3, 'date'), (3, 'updated'), (4, 'date')]
+
+
+def test_workers_and_chunks_match_serial():
+    data = pd.DataFrame({
+        'date': [f'{day % 35:02d}.01.2024' if day % 7 else '' for day in range(1000)],
+        'updated': [f'2024-01-{day % 40:02d}' for day in range(1000)],
+        'count': [str(day % 13) for day in range(1000)],
+    }, dtype=object)
+    serial = Validator(RULES).validate(data)
+    assert serial
+    assert Validator(RULES, workers=2, chunk_size=150).validate(data) == serial
+    chunks = (data.iloc[start:start + 150] for start in range(0, len(data), 150))
+    assert Validator(RULES).validate_chunks(chunks) == serial